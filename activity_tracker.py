@@ -0,0 +1,118 @@
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import discord
+
+
+@dataclass
+class MemberActivity:
+    member_id: int
+    display_name: str
+    messages: int = 0
+    voice_seconds: float = 0.0
+    last_seen: float = 0.0
+    # "YYYY-MM-DD" -> [messages, voice_seconds]
+    daily: Dict[str, List[float]] = field(default_factory=dict)
+
+    def to_update(self) -> Dict:
+        return {
+            "member_id": self.member_id,
+            "display_name": self.display_name,
+            "messages": self.messages,
+            "voice_seconds": self.voice_seconds,
+            "last_seen": self.last_seen,
+            "daily": self.daily,
+        }
+
+
+class ActivityTracker:
+    # Event handlers only bump in-memory counters; storage is written in
+    # batches by drain(), so the per-message cost is a couple of dict updates.
+    def __init__(self, tracked_role_ids: Iterable[int]):
+        self.tracked_role_ids = tuple(tracked_role_ids)
+        self._pending: Dict[int, MemberActivity] = {}
+        self._voice_started: Dict[int, Tuple[discord.Member, float]] = {}
+
+    def is_tracked(self, member: discord.Member) -> bool:
+        return any(member.get_role(role_id) is not None for role_id in self.tracked_role_ids)
+
+    def _entry(self, member: discord.Member) -> MemberActivity:
+        entry = self._pending.get(member.id)
+        if entry is None:
+            entry = self._pending[member.id] = MemberActivity(member.id, member.display_name)
+        else:
+            entry.display_name = member.display_name
+        return entry
+
+    @staticmethod
+    def _day(ts: float) -> str:
+        return datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+
+    def record_message(self, member: discord.Member, when: Optional[float] = None) -> None:
+        when = when or time.time()
+        entry = self._entry(member)
+        entry.messages += 1
+        entry.last_seen = when
+        entry.daily.setdefault(self._day(when), [0, 0.0])[0] += 1
+
+    def voice_join(self, member: discord.Member, when: Optional[float] = None) -> None:
+        when = when or time.time()
+        self._voice_started.setdefault(member.id, (member, when))
+        self._entry(member).last_seen = when
+
+    def voice_leave(self, member: discord.Member, when: Optional[float] = None) -> None:
+        when = when or time.time()
+        session = self._voice_started.pop(member.id, None)
+        if session is None:
+            return
+        self._add_voice(self._entry(member), session[1], when)
+
+    def close_missing_sessions(self, present_ids: Iterable[int], ended: Optional[float] = None) -> int:
+        # Members who left voice while the gateway was down never produce a
+        # voice_leave; their sessions are closed at `ended` (disconnect time)
+        present = set(present_ids)
+        ended = ended or time.time()
+        closed = 0
+        for member_id, (member, started) in list(self._voice_started.items()):
+            if member_id in present:
+                continue
+            del self._voice_started[member_id]
+            self._add_voice(self._entry(member), started, max(started, ended))
+            closed += 1
+        return closed
+
+    def _add_voice(self, entry: MemberActivity, started: float, ended: float) -> None:
+        seconds = max(0.0, ended - started)
+        entry.voice_seconds += seconds
+        entry.last_seen = ended
+        entry.daily.setdefault(self._day(ended), [0, 0.0])[1] += seconds
+
+    def pending_count(self) -> int:
+        return len(self._pending) + len(self._voice_started)
+
+    def restore(self, updates: Iterable[Dict]) -> None:
+        # Puts drained updates back (failed flush, warm start); they are
+        # merged with whatever was counted in the meantime.
+        for update in updates:
+            entry = self._pending.get(update["member_id"])
+            if entry is None:
+                entry = self._pending[update["member_id"]] = MemberActivity(update["member_id"], update["display_name"])
+            entry.messages += update["messages"]
+            entry.voice_seconds += update["voice_seconds"]
+            entry.last_seen = max(entry.last_seen, update["last_seen"])
+            for day, (messages, voice_seconds) in update["daily"].items():
+                bucket = entry.daily.setdefault(day, [0, 0.0])
+                bucket[0] += messages
+                bucket[1] += voice_seconds
+
+    def drain(self) -> List[Dict]:
+        # Open voice sessions are split at the flush point so long calls are counted too
+        now = time.time()
+        for member_id, (member, started) in list(self._voice_started.items()):
+            self._add_voice(self._entry(member), started, now)
+            self._voice_started[member_id] = (member, now)
+        updates = [entry.to_update() for entry in self._pending.values()]
+        self._pending = {}
+        return updates
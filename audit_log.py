@@ -0,0 +1,305 @@
+import bisect
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from .data_manager import DATE_FMT
+
+# Time bucket width for the index (one day)
+BUCKET_SECONDS = 24 * 3600
+
+
+@dataclass
+class AuditEvent:
+    ts: float
+    actor: Optional[str]
+    action: str
+    target: Optional[str] = None
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ts": self.ts,
+            "actor": self.actor,
+            "action": self.action,
+            "target": self.target,
+            "details": self.details,
+        }
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> "AuditEvent":
+        return cls(
+            ts=float(raw.get("ts", 0)),
+            actor=raw.get("actor"),
+            action=raw.get("action", "other"),
+            target=raw.get("target"),
+            details=raw.get("details") or {},
+        )
+
+    def date_str(self) -> str:
+        return datetime.fromtimestamp(self.ts).strftime(DATE_FMT)
+
+
+# Known bot_logs.txt line formats (legacy English and current Ukrainian)
+_LINE_RE = re.compile(r"^\[(\d{2}\.\d{2}\.\d{4} \d{2}:\d{2})\] (.*)$")
+_LOG_PATTERNS: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"^(?P<actor>\S+) added (?P<target>\S+) as (?P<role>leader|deputie) in (?P<org>.*?) - (?P<position>.*)$"), "add_person"),
+    (re.compile(r"^(?P<actor>\S+) removed (?P<target>\S+) from (?P<role>leader|deputie)$"), "remove_person"),
+    (re.compile(r"^(?P<actor>\S+) додав\(ла\) (?P<target>\S+) як (?P<role>керівника|заступника) у (?P<org>.*?) - (?P<position>.*)$"), "add_person"),
+    (re.compile(r"^(?P<actor>\S+) видалив\(ла\) (?P<target>\S+) із (?P<role>керівників|заступників)$"), "remove_person"),
+    (re.compile(r"^(?P<actor>\S+) видав\(ла\) ПОПЕРЕДЖЕННЯ (?P<target>\S+): (?P<reason>.*) \(разом (?P<count>\d+)\)$"), "warning"),
+    (re.compile(r"^(?P<actor>\S+) видав\(ла\) ДОГАНУ №(?P<count>\d+) (?P<target>\S+): (?P<reason>.*)$"), "reprimand"),
+    (re.compile(r"^(?P<actor>\S+) ЗВІЛЬНИВ\(ЛА\) (?P<target>\S+) через \d+ догани\. Причина: (?P<reason>.*)$"), "dismissal"),
+    (re.compile(r"^News published by (?P<actor>\S+) in #(?P<channel>\S+): (?P<text>.*)$"), "news"),
+    (re.compile(r"^Auto-cleanup removed (?P<count>\d+) old news entries$"), "news_cleanup"),
+    (re.compile(r"^Error: (?P<error>.*)$"), "error"),
+]
+_ROLE_CATEGORY = {
+    "leader": "leaders", "керівника": "leaders", "керівників": "leaders",
+    "deputie": "deputies", "заступника": "deputies", "заступників": "deputies",
+}
+
+
+def parse_log_line(line: str) -> Optional[AuditEvent]:
+    m = _LINE_RE.match(line.rstrip("\n"))
+    if not m:
+        return None
+    try:
+        ts = datetime.strptime(m.group(1), DATE_FMT).timestamp()
+    except ValueError:
+        return None
+    text = m.group(2)
+    for pattern, action in _LOG_PATTERNS:
+        pm = pattern.match(text)
+        if not pm:
+            continue
+        details = {k: v for k, v in pm.groupdict().items() if k not in ("actor", "target", "role")}
+        role = pm.groupdict().get("role")
+        if role:
+            details["category"] = _ROLE_CATEGORY.get(role, role)
+        return AuditEvent(ts, pm.groupdict().get("actor"), action, pm.groupdict().get("target"), details)
+    # Unknown format: keep the raw text so nothing is lost
+    return AuditEvent(ts, None, "other", None, {"text": text})
+
+
+def parse_log_file(log_path: str, limit: Optional[int] = None, progress=None) -> List[AuditEvent]:
+    # Pure function so the backfill can run in a worker process. Only the
+    # first `limit` bytes are parsed: lines appended after the backfill was
+    # planned are already in the audit log.
+    with open(log_path, "rb") as f:
+        raw = f.read() if limit is None else f.read(limit)
+    lines = raw.decode("utf-8", errors="replace").splitlines()
+    parsed = []
+    for i, line in enumerate(lines, start=1):
+        event = parse_log_line(line)
+        if event:
+            parsed.append(event)
+        if progress and i % 5000 == 0:
+            progress.check()
+            progress.report(i, len(lines))
+    parsed.sort(key=lambda e: e.ts)
+    return parsed
+
+
+def target_keys(event: AuditEvent) -> Set[str]:
+    # Roster events carry the member ID as well, so a person can be found
+    # by it even after a nickname change
+    keys = {event.target.lower()} if event.target else set()
+    if event.details.get("member_id"):
+        keys.add(str(event.details["member_id"]))
+    return keys
+
+
+class AuditLog:
+    def __init__(self, audit_path: str, legacy_log_path: Optional[str] = None, max_events: Optional[int] = None):
+        self.audit_path = audit_path
+        # Only the newest max_events stay in memory; older ones are read from
+        # the file on demand (query_archive)
+        self.max_events = max_events
+        self.archived_before: Optional[float] = None
+        self._reset()
+        # Legacy log still to import (path, byte size at planning time); done
+        # via backfill() or import_events(). The plan is kept in a marker file
+        # because record() may create the audit log before the import ends.
+        self.pending_backfill: Optional[str] = None
+        self.backfill_limit: Optional[int] = None
+        self._marker_path = audit_path + ".backfill"
+        if os.path.exists(self._marker_path):
+            self._read_marker()
+        elif not os.path.exists(self.audit_path) and legacy_log_path and os.path.exists(legacy_log_path):
+            self.pending_backfill = legacy_log_path
+            self.backfill_limit = os.path.getsize(legacy_log_path)
+            with open(self._marker_path, "w", encoding="utf-8") as f:
+                json.dump({"log_path": self.pending_backfill, "limit": self.backfill_limit}, f)
+        if os.path.exists(self.audit_path):
+            self._load()
+
+    def _read_marker(self) -> None:
+        try:
+            with open(self._marker_path, "r", encoding="utf-8") as f:
+                marker = json.load(f)
+            self.pending_backfill = marker["log_path"]
+            self.backfill_limit = int(marker["limit"])
+        except (OSError, ValueError, KeyError, TypeError):
+            os.remove(self._marker_path)
+
+    # Indexing
+    def _reset(self) -> None:
+        self.events: List[AuditEvent] = []
+        self._buckets: Dict[int, List[int]] = {}
+        self._bucket_keys: List[int] = []
+        self._by_actor: Dict[str, List[int]] = {}
+        self._by_target: Dict[str, List[int]] = {}
+
+    def _trim(self) -> None:
+        # Rebuilt with 10% slack, so the cost is amortized over many records
+        if not self.max_events or len(self.events) <= self.max_events + self.max_events // 10:
+            return
+        events = sorted(self.events, key=lambda e: e.ts)
+        boundary = events[-self.max_events].ts
+        self.archived_before = boundary if self.archived_before is None else max(self.archived_before, boundary)
+        self._reset()
+        for event in events:
+            if event.ts >= boundary:
+                self._index(event)
+
+    def _index(self, event: AuditEvent) -> None:
+        idx = len(self.events)
+        self.events.append(event)
+        bucket = int(event.ts // BUCKET_SECONDS)
+        if bucket not in self._buckets:
+            self._buckets[bucket] = []
+            bisect.insort(self._bucket_keys, bucket)
+        self._buckets[bucket].append(idx)
+        if event.actor:
+            self._by_actor.setdefault(event.actor.lower(), []).append(idx)
+        for key in target_keys(event):
+            self._by_target.setdefault(key, []).append(idx)
+
+    def _load(self) -> None:
+        with open(self.audit_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    self._index(AuditEvent.from_dict(json.loads(line)))
+                except Exception:
+                    # Skip corrupted lines
+                    continue
+                self._trim()
+
+    def _append(self, events: List[AuditEvent]) -> None:
+        with open(self.audit_path, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(event.to_dict(), ensure_ascii=False) + "\n")
+
+    def backfill(self, log_path: str, limit: Optional[int] = None) -> int:
+        # One-time import of the legacy text log
+        return self.import_events(parse_log_file(log_path, limit))
+
+    def import_events(self, events: List[AuditEvent]) -> int:
+        self._append(events)
+        if os.path.exists(self._marker_path):
+            os.remove(self._marker_path)
+        for event in events:
+            if self.archived_before is None or event.ts >= self.archived_before:
+                self._index(event)
+        self._trim()
+        self.pending_backfill = None
+        self.backfill_limit = None
+        return len(events)
+
+    def record(self, actor: Optional[str], action: str, target: Optional[str] = None, **details: Any) -> AuditEvent:
+        event = AuditEvent(time.time(), actor, action, target, details)
+        self._append([event])
+        self._index(event)
+        self._trim()
+        return event
+
+    # Queries
+    def _time_candidates(self, since: Optional[float], until: Optional[float]) -> List[int]:
+        lo = 0 if since is None else bisect.bisect_left(self._bucket_keys, int(since // BUCKET_SECONDS))
+        hi = len(self._bucket_keys) if until is None else bisect.bisect_right(self._bucket_keys, int(until // BUCKET_SECONDS))
+        ids: List[int] = []
+        for key in self._bucket_keys[lo:hi]:
+            ids.extend(self._buckets[key])
+        return ids
+
+    def query(
+        self,
+        actor: Optional[str] = None,
+        target: Union[str, Sequence[str], None] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> List[AuditEvent]:
+        # The narrowest inverted list drives the scan, other filters are checked in place
+        lists = []
+        if actor:
+            lists.append(self._by_actor.get(actor.lower(), []))
+        if target:
+            # Several targets are aliases of one person (nickname, member ID)
+            aliases = [target] if isinstance(target, str) else target
+            ids = {i for alias in aliases for i in self._by_target.get(alias.lower(), [])}
+            lists.append(sorted(ids))
+        if lists:
+            candidates = min(lists, key=len)
+            if len(lists) > 1:
+                others = [set(l) for l in lists if l is not candidates]
+                candidates = [i for i in candidates if all(i in s for s in others)]
+        else:
+            candidates = self._time_candidates(since, until)
+        result = []
+        for i in candidates:
+            event = self.events[i]
+            if since is not None and event.ts < since:
+                continue
+            if until is not None and event.ts > until:
+                continue
+            result.append(event)
+        result.sort(key=lambda e: e.ts, reverse=True)
+        return result
+
+    def query_archive(
+        self,
+        actor: Optional[str] = None,
+        target: Union[str, Sequence[str], None] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> List[AuditEvent]:
+        # Events trimmed from memory, streamed from the file; blocking I/O,
+        # meant to run in an executor. Empty while nothing was trimmed.
+        if self.archived_before is None:
+            return []
+        aliases = set()
+        if target:
+            aliases = {a.lower() for a in ([target] if isinstance(target, str) else target)}
+        result = []
+        with open(self.audit_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = AuditEvent.from_dict(json.loads(line))
+                except Exception:
+                    continue
+                if event.ts >= self.archived_before:
+                    continue
+                if (since is not None and event.ts < since) or (until is not None and event.ts > until):
+                    continue
+                if actor and (event.actor or "").lower() != actor.lower():
+                    continue
+                if aliases and not aliases & target_keys(event):
+                    continue
+                result.append(event)
+        result.sort(key=lambda e: e.ts, reverse=True)
+        return result
+
+
+def paginate(events: List[AuditEvent], page: int, per_page: int = 10) -> Tuple[List[AuditEvent], int]:
+    pages = max(1, (len(events) + per_page - 1) // per_page)
+    page = min(max(1, page), pages)
+    start = (page - 1) * per_page
+    return events[start:start + per_page], pages
@@ -0,0 +1,165 @@
+import json
+import os
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, Optional, Tuple
+
+from .command_guard import RateQuota
+from .role_manager import RoleIDs
+
+
+class ConfigError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class BotConfig:
+    role_ids: RoleIDs
+    admin_roles: Tuple[str, ...]
+    warnings_per_reprimand: int
+    max_reprimands: int
+    news_ttl_hours: int
+    auto_delete_seconds: int
+    warning_expiry_days: int
+    reprimand_expiry_days: int
+    rate_limits: Dict[str, RateQuota]
+    duplicate_window_seconds: int
+    coalesce_window_seconds: int
+
+
+# Lower bounds for numeric settings
+_INT_MINIMUMS = {
+    "warnings_per_reprimand": 1,
+    "max_reprimands": 1,
+    "news_ttl_hours": 1,
+    "auto_delete_seconds": 1,
+    "warning_expiry_days": 0,
+    "reprimand_expiry_days": 0,
+    "duplicate_window_seconds": 0,
+    "coalesce_window_seconds": 0,
+}
+
+
+def _parse_role_ids(raw: Any) -> RoleIDs:
+    if not isinstance(raw, dict):
+        raise ConfigError("role_ids must be an object")
+    names = [f.name for f in fields(RoleIDs)]
+    unknown = set(raw) - set(names)
+    if unknown:
+        raise ConfigError(f"role_ids: unknown keys {sorted(unknown)}")
+    missing = [n for n in names if n not in raw]
+    if missing:
+        raise ConfigError(f"role_ids: missing keys {missing}")
+    values = {}
+    for name in names:
+        value = raw[name]
+        if isinstance(value, str) and value.isdigit():
+            value = int(value)
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            raise ConfigError(f"role_ids.{name} must be a positive role ID")
+        values[name] = value
+    return RoleIDs(**values)
+
+
+def _parse_rate_limits(raw: Any) -> Dict[str, RateQuota]:
+    # {"default": {"burst": 5, "per_seconds": 10}, "<command>": {...}}
+    if not isinstance(raw, dict):
+        raise ConfigError("rate_limits must be an object")
+    quotas = {}
+    for command, quota in raw.items():
+        if not isinstance(quota, dict) or set(quota) != {"burst", "per_seconds"}:
+            raise ConfigError(f"rate_limits.{command} must have exactly burst and per_seconds")
+        burst, per_seconds = quota["burst"], quota["per_seconds"]
+        if not isinstance(burst, int) or isinstance(burst, bool) or burst < 1:
+            raise ConfigError(f"rate_limits.{command}.burst must be an integer >= 1")
+        if not isinstance(per_seconds, (int, float)) or isinstance(per_seconds, bool) or per_seconds <= 0:
+            raise ConfigError(f"rate_limits.{command}.per_seconds must be a positive number")
+        quotas[command] = RateQuota(burst, float(per_seconds))
+    return quotas
+
+
+def parse_config(raw: Any, defaults: BotConfig) -> BotConfig:
+    # Keys missing from the file keep their defaults; unknown keys are
+    # rejected so typos do not silently fall back.
+    if not isinstance(raw, dict):
+        raise ConfigError("config root must be an object")
+    known = {f.name for f in fields(BotConfig)}
+    unknown = set(raw) - known
+    if unknown:
+        raise ConfigError(f"unknown keys {sorted(unknown)}")
+    changes: Dict[str, Any] = {}
+    if "role_ids" in raw:
+        changes["role_ids"] = _parse_role_ids(raw["role_ids"])
+    if "admin_roles" in raw:
+        roles = raw["admin_roles"]
+        if not isinstance(roles, list) or not all(isinstance(r, str) and r.strip() for r in roles):
+            raise ConfigError("admin_roles must be a list of role names")
+        changes["admin_roles"] = tuple(roles)
+    if "rate_limits" in raw:
+        # Merged over the defaults: listing one command keeps the others
+        changes["rate_limits"] = {**defaults.rate_limits, **_parse_rate_limits(raw["rate_limits"])}
+    for name, minimum in _INT_MINIMUMS.items():
+        if name not in raw:
+            continue
+        value = raw[name]
+        if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+            raise ConfigError(f"{name} must be an integer >= {minimum}")
+        changes[name] = value
+    return replace(defaults, **changes)
+
+
+def load_config(path: str, defaults: BotConfig) -> BotConfig:
+    if not os.path.exists(path):
+        return defaults
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ConfigError(f"invalid JSON: {e}") from e
+    except UnicodeDecodeError as e:
+        raise ConfigError(f"not valid UTF-8: {e}") from e
+    except (OSError, ValueError) as e:
+        # Permissions, the file vanishing between stat() and open(), ...
+        raise ConfigError(f"cannot read {path}: {e}") from e
+    return parse_config(raw, defaults)
+
+
+class ConfigWatcher:
+    # mtime polling; check() is cheap enough to run every few seconds
+    def __init__(self, path: str, defaults: BotConfig):
+        self.path = path
+        self.defaults = defaults
+        self._mtime: Optional[float] = None
+        # Set once the file itself was loaded: from then on a missing file
+        # means it was deleted, not that the defaults are wanted
+        self._loaded_file = False
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _check_present(self, mtime: Optional[float]) -> None:
+        if mtime is None and self._loaded_file:
+            raise ConfigError(f"{self.path} is missing; keeping the current settings")
+
+    def load(self) -> BotConfig:
+        mtime = self._current_mtime()
+        self._check_present(mtime)
+        config = load_config(self.path, self.defaults)
+        self._mtime = mtime
+        self._loaded_file = mtime is not None
+        return config
+
+    def check(self) -> Optional[BotConfig]:
+        # Returns a new config when the file changed, None otherwise.
+        # On a validation error the mtime is still recorded so a broken file
+        # is reported once, not on every poll.
+        mtime = self._current_mtime()
+        if mtime == self._mtime:
+            return None
+        self._mtime = mtime
+        self._check_present(mtime)
+        config = load_config(self.path, self.defaults)
+        self._loaded_file = mtime is not None
+        return config
@@ -0,0 +1,138 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional, Tuple
+
+# Quota used for commands without their own entry
+DEFAULT_QUOTA_KEY = "default"
+
+# Result of a shared reply whose first invocation failed: waiters must run
+# the command themselves
+RETRY = object()
+
+
+@dataclass(frozen=True)
+class RateQuota:
+    burst: int
+    per_seconds: float
+
+    @property
+    def refill_rate(self) -> float:
+        return self.burst / self.per_seconds
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "warned")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.warned = False
+
+
+class RateLimiter:
+    # One token bucket per (user, command): up to `burst` invocations at once,
+    # refilled continuously at burst/per_seconds.
+    def __init__(self, quotas: Dict[str, RateQuota]):
+        self.quotas: Dict[str, RateQuota] = dict(quotas)
+        self._buckets: Dict[Tuple[int, str], _Bucket] = {}
+        self._calls = 0
+
+    def set_quotas(self, quotas: Dict[str, RateQuota]) -> None:
+        self.quotas = dict(quotas)
+        self._buckets.clear()
+
+    def quota(self, command: str) -> Optional[RateQuota]:
+        return self.quotas.get(command) or self.quotas.get(DEFAULT_QUOTA_KEY)
+
+    def acquire(self, user_id: int, command: str, now: Optional[float] = None) -> Tuple[float, bool]:
+        # (retry_after, notify): retry_after is 0 when a token was taken;
+        # notify is True only for the first rejection of a streak, so a
+        # spammer gets one warning instead of one per message.
+        quota = self.quota(command)
+        if quota is None:
+            return 0.0, False
+        now = time.monotonic() if now is None else now
+        self._calls += 1
+        if self._calls % 256 == 0:
+            self._prune(now)
+        bucket = self._buckets.get((user_id, command))
+        if bucket is None:
+            bucket = self._buckets[(user_id, command)] = _Bucket(float(quota.burst), now)
+        else:
+            bucket.tokens = min(float(quota.burst), bucket.tokens + (now - bucket.updated) * quota.refill_rate)
+            bucket.updated = now
+        if bucket.tokens >= 1.0:
+            bucket.tokens -= 1.0
+            bucket.warned = False
+            return 0.0, False
+        notify = not bucket.warned
+        bucket.warned = True
+        return (1.0 - bucket.tokens) / quota.refill_rate, notify
+
+    def _prune(self, now: float) -> None:
+        # Buckets that have refilled completely carry no state worth keeping
+        for key, bucket in list(self._buckets.items()):
+            quota = self.quota(key[1])
+            if quota is None or now - bucket.updated >= quota.per_seconds:
+                del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class DuplicateGuard:
+    # Remembers recent mutating commands by (author, command, target)
+    def __init__(self, window: float):
+        self.window = window
+        self._seen: Dict[Hashable, float] = {}
+
+    def check(self, key: Hashable, now: Optional[float] = None) -> float:
+        # 0 when the command may run (and is recorded), otherwise the
+        # seconds left until the same command is accepted again
+        if self.window <= 0:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        if len(self._seen) > 256:
+            self._seen = {k: t for k, t in self._seen.items() if now - t < self.window}
+        seen_at = self._seen.get(key)
+        if seen_at is not None and now - seen_at < self.window:
+            return self.window - (now - seen_at)
+        self._seen[key] = now
+        return 0.0
+
+    def release(self, key: Hashable) -> None:
+        # A failed command should not block an immediate retry
+        self._seen.pop(key, None)
+
+
+class ResponseCoalescer:
+    # Identical read-only commands within the window share the first
+    # invocation's reply instead of computing and sending their own.
+    def __init__(self, window: float):
+        self.window = window
+        self._entries: Dict[Hashable, Tuple[float, asyncio.Future]] = {}
+
+    def join(self, key: Hashable, now: Optional[float] = None) -> Optional[asyncio.Future]:
+        # None: the caller is first and must produce the reply (and call
+        # resolve()); otherwise the future of the reply being produced.
+        if self.window <= 0:
+            return None
+        now = time.monotonic() if now is None else now
+        if len(self._entries) > 100:
+            self._entries = {k: e for k, e in self._entries.items() if now - e[0] < self.window}
+        entry = self._entries.get(key)
+        if entry is not None and now - entry[0] < self.window:
+            return entry[1]
+        self._entries[key] = (now, asyncio.get_running_loop().create_future())
+        return None
+
+    def discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None and not entry[1].done():
+            entry[1].set_result(RETRY)
+
+    def resolve(self, key: Hashable, result: object) -> None:
+        entry = self._entries.get(key)
+        if entry is not None and not entry[1].done():
+            entry[1].set_result(result)
@@ -1,7 +1,10 @@
+import copy
+import csv
+import io
 import json
 import os
-from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
 
 DEFAULT_DATA: Dict[str, Any] = {
     "leaders": {},
@@ -16,11 +19,41 @@ DEFAULT_DATA: Dict[str, Any] = {
 
 DATE_FMT = "%d.%m.%Y %H:%M"
 
+ACTIVITY_ACTIVE = "Активний"
+ACTIVITY_INACTIVE = "Неактивний"
+
 
 def now_str() -> str:
     return datetime.now(timezone.utc).astimezone().strftime(DATE_FMT)
 
 
+def roster_csv(data: Dict[str, Any], progress=None) -> bytes:
+    # Roster export; module-level so it can run in a worker process
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow([
+        "category", "nickname", "organization", "position", "appointment_date", "appointed_by",
+        "warnings", "reprimands", "activity", "last_activity", "messages", "voice_minutes",
+    ])
+    people = [(c, n, i) for c in ("leaders", "deputies") for n, i in data.get(c, {}).items()]
+    for done, (category, nick, info) in enumerate(people, start=1):
+        stats = info.get("activity_stats", {})
+        writer.writerow([
+            category, nick,
+            info.get("організація") or info.get("organization", ""),
+            info.get("посада") or info.get("position", ""),
+            info.get("appointment_date", ""), info.get("appointed_by", ""),
+            len(info.get("warnings", [])), len(info.get("reprimands", [])),
+            info.get("activity", ""), info.get("last_activity", ""),
+            stats.get("messages", 0), stats.get("voice_minutes", 0),
+        ])
+        if progress and done % 200 == 0:
+            progress.check()
+            progress.report(done, len(people))
+    # BOM so Excel opens the Cyrillic text correctly
+    return out.getvalue().encode("utf-8-sig")
+
+
 class DataManager:
     def __init__(self, data_path: str, log_path: str):
         self.data_path = data_path
@@ -37,13 +70,20 @@ class DataManager:
             with open(self.data_path, "r", encoding="utf-8") as f:
                 return json.load(f)
         except Exception:
-            # Recovery to default if corrupted
+            # Recovery to default if corrupted; the broken file is kept aside
+            # so it can be inspected or restored from a snapshot
+            if os.path.exists(self.data_path):
+                stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+                os.replace(self.data_path, f"{self.data_path}.corrupt-{stamp}")
             self._write(DEFAULT_DATA)
-            return DEFAULT_DATA.copy()
+            return copy.deepcopy(DEFAULT_DATA)
 
     def _write(self, data: Dict[str, Any]) -> None:
-        with open(self.data_path, "w", encoding="utf-8") as f:
+        # Write-then-rename so a crash mid-write never leaves a truncated file
+        tmp = self.data_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.data_path)
 
     def load(self) -> Dict[str, Any]:
         return self._read()
@@ -57,10 +97,10 @@ class DataManager:
             f.write(line)
         print(line, end="")
 
-    def increment_commands(self) -> None:
+    def increment_commands(self, count: int = 1) -> None:
         data = self._read()
         data.setdefault("settings", {})
-        data["settings"]["total_commands"] = int(data["settings"].get("total_commands", 0)) + 1
+        data["settings"]["total_commands"] = int(data["settings"].get("total_commands", 0)) + count
         self._write(data)
 
     def set_start_time(self) -> None:
@@ -70,15 +110,18 @@ class DataManager:
         self._write(data)
 
     # News helpers
-    def add_news(self, text: str, author: str, channel_name: str, channel_id: int) -> None:
+    def add_news(self, text: str, author: str, copies: List[Dict[str, Any]]) -> None:
+        # copies: [{"channel": name, "channel_id": id, "message_id": id}, ...]
         data = self._read()
         data.setdefault("news", [])
+        first = copies[0] if copies else {}
         data["news"].insert(0, {
             "text": text,
             "date": now_str(),
             "author": author,
-            "channel": channel_name,
-            "channel_id": channel_id,
+            "channel": first.get("channel"),
+            "channel_id": first.get("channel_id"),
+            "copies": copies,
         })
         self._write(data)
 
@@ -128,7 +171,7 @@ class DataManager:
             return True
         return False
 
-    def add_warning(self, category: str, nickname: str, reason: str, issued_by: str) -> int:
+    def add_warning(self, category: str, nickname: str, reason: str, issued_by: str, expires_at: Optional[float] = None) -> int:
         data = self._read()
         person = data.get(category, {}).get(nickname)
         if not person:
@@ -138,6 +181,7 @@ class DataManager:
             "date": now_str(),
             "reason": reason,
             "issued_by": issued_by,
+            "expires_at": expires_at,
         })
         self._write(data)
         return len(person["warnings"])
@@ -150,7 +194,7 @@ class DataManager:
         person["warnings"] = []
         self._write(data)
 
-    def add_reprimand(self, category: str, nickname: str, reason: str, issued_by: str) -> int:
+    def add_reprimand(self, category: str, nickname: str, reason: str, issued_by: str, expires_at: Optional[float] = None) -> int:
         data = self._read()
         person = data.get(category, {}).get(nickname)
         if not person:
@@ -162,6 +206,106 @@ class DataManager:
             "reason": reason,
             "issued_by": issued_by,
             "number": number,
+            "expires_at": expires_at,
         })
         self._write(data)
         return number
+
+    # Expiry helpers
+    def backfill_expiries(self, ttl_seconds: Dict[str, Optional[int]]) -> List[Dict[str, Any]]:
+        # Gives legacy entries an "expires_at" (issue date + TTL) and returns
+        # every pending expiry so the in-memory queue can be rebuilt on start.
+        data = self._read()
+        changed = False
+        pending = []
+        for category in ("leaders", "deputies"):
+            for nick, info in data.get(category, {}).items():
+                for kind, ttl in ttl_seconds.items():
+                    for entry in info.get(kind, []):
+                        if entry.get("expires_at") is None and ttl:
+                            try:
+                                issued = datetime.strptime(entry.get("date", ""), DATE_FMT).timestamp()
+                            except ValueError:
+                                continue
+                            entry["expires_at"] = issued + ttl
+                            changed = True
+                        if entry.get("expires_at") is not None:
+                            pending.append({"at": entry["expires_at"], "category": category, "nickname": nick, "kind": kind})
+        if changed:
+            self._write(data)
+        return pending
+
+    def expire_punishments(self, category: str, nickname: str, kind: str, until: float) -> Optional[int]:
+        # Moves due entries to "expired_<kind>"; returns the remaining active
+        # count, or None when nothing was due (already expired/cleared/removed).
+        data = self._read()
+        person = data.get(category, {}).get(nickname)
+        if not person:
+            return None
+        active = person.get(kind, [])
+        due = [e for e in active if e.get("expires_at") is not None and e["expires_at"] <= until]
+        if not due:
+            return None
+        person[kind] = [e for e in active if e not in due]
+        if kind == "reprimands":
+            for number, entry in enumerate(person[kind], start=1):
+                entry["number"] = number
+        person.setdefault(f"expired_{kind}", []).extend(due)
+        self._write(data)
+        return len(person[kind])
+
+    # Activity helpers
+    def apply_activity(self, updates: List[Dict[str, Any]], inactive_after_days: int, history_days: int = 30) -> int:
+        # One read/write per batch: merge counters, then refresh every "activity" status
+        data = self._read()
+        people = [
+            (nick, info)
+            for category in ("leaders", "deputies")
+            for nick, info in data.get(category, {}).items()
+        ]
+        by_id = {info.get("member_id"): info for _nick, info in people if info.get("member_id")}
+        by_name = {nick: info for nick, info in people}
+        oldest_day = (datetime.now() - timedelta(days=history_days)).strftime("%Y-%m-%d")
+        matched = 0
+        for update in updates:
+            info = by_id.get(update["member_id"]) or by_name.get(update["display_name"])
+            if info is None:
+                continue
+            matched += 1
+            info["member_id"] = update["member_id"]
+            stats = info.setdefault("activity_stats", {"messages": 0, "voice_minutes": 0, "daily": {}})
+            stats["messages"] = int(stats.get("messages", 0)) + update["messages"]
+            stats["voice_minutes"] = round(float(stats.get("voice_minutes", 0)) + update["voice_seconds"] / 60.0, 1)
+            daily = stats.setdefault("daily", {})
+            for day, (messages, voice_seconds) in update["daily"].items():
+                bucket = daily.setdefault(day, {"messages": 0, "voice_minutes": 0})
+                bucket["messages"] += messages
+                bucket["voice_minutes"] = round(bucket["voice_minutes"] + voice_seconds / 60.0, 1)
+            for day in [d for d in daily if d < oldest_day]:
+                del daily[day]
+            if update["last_seen"]:
+                info["last_activity"] = datetime.fromtimestamp(update["last_seen"]).strftime(DATE_FMT)
+        threshold = datetime.now() - timedelta(days=inactive_after_days)
+        for _nick, info in people:
+            try:
+                last = datetime.strptime(info.get("last_activity", ""), DATE_FMT)
+            except ValueError:
+                continue
+            info["activity"] = ACTIVITY_ACTIVE if last >= threshold else ACTIVITY_INACTIVE
+        self._write(data)
+        return matched
+
+    def inactive_people(self, days: int) -> List[Dict[str, Any]]:
+        data = self._read()
+        threshold = datetime.now() - timedelta(days=days)
+        result = []
+        for category in ("leaders", "deputies"):
+            for nick, info in data.get(category, {}).items():
+                try:
+                    last = datetime.strptime(info.get("last_activity", ""), DATE_FMT)
+                except ValueError:
+                    last = None
+                if last is None or last < threshold:
+                    result.append({"nickname": nick, "category": category, "info": info, "last": last})
+        result.sort(key=lambda r: r["last"] or datetime.min)
+        return result
@@ -0,0 +1,83 @@
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable, List, Optional, Tuple
+
+# Upper bound for one sleep so wall-clock jumps are picked up
+MAX_SLEEP_SECONDS = 3600
+
+
+@dataclass(frozen=True)
+class Expiry:
+    at: float
+    category: str
+    nickname: str
+    kind: str  # "warnings" | "reprimands"
+
+
+class ExpiryQueue:
+    # Min-heap of deadlines served by a single task that sleeps until the
+    # earliest one. The deadlines themselves live in the roster records
+    # ("expires_at"), so the heap is rebuilt from storage after a restart.
+    def __init__(self, handler: Callable[[Expiry], Awaitable[None]], log: Callable[[str], None] = print):
+        self.handler = handler
+        self.log = log
+        self._heap: List[Tuple[float, int, Expiry]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, expiry: Expiry) -> None:
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (expiry.at, next(self._seq), expiry))
+        if self._wakeup and (earliest is None or expiry.at < earliest):
+            self._wakeup.set()
+
+    def load(self, expiries: Iterable[Expiry]) -> None:
+        for expiry in expiries:
+            self._heap.append((expiry.at, next(self._seq), expiry))
+        heapq.heapify(self._heap)
+        if self._wakeup:
+            self._wakeup.set()
+
+    def next_deadline(self) -> Optional[float]:
+        return self._heap[0][0] if self._heap else None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now:
+                _at, _seq, expiry = heapq.heappop(self._heap)
+                try:
+                    await self.handler(expiry)
+                except Exception as e:
+                    self.log(f"Expiry handler failed for {expiry}: {type(e).__name__}: {e}")
+            self._wakeup.clear()
+            timeout = MAX_SLEEP_SECONDS
+            if self._heap:
+                timeout = min(timeout, max(0.0, self._heap[0][0] - time.time()))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
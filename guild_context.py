@@ -0,0 +1,106 @@
+import bisect
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import discord
+
+from .request_scheduler import RequestScheduler
+from .role_manager import RoleIDs, RoleManager
+
+
+def normalize_channel_name(name: str) -> str:
+    return name.strip().lstrip("#").lower()
+
+
+class GuildContext:
+    # Lookups that every command needs; rebuilt lazily after invalidation
+    def __init__(self, guild: discord.Guild, role_ids: RoleIDs, admin_role_names: Iterable[str], scheduler: Optional[RequestScheduler] = None):
+        self.guild = guild
+        self.role_manager = RoleManager(guild, role_ids, scheduler)
+        self._admin_role_names = tuple(admin_role_names)
+        self._admin_role_ids: Optional[FrozenSet[int]] = None
+        self._channels: Optional[Dict[str, discord.TextChannel]] = None
+        self._members: Optional[List[Tuple[str, int, str]]] = None
+
+    def invalidate_roles(self) -> None:
+        self._admin_role_ids = None
+        self.role_manager.clear_cache()
+
+    def invalidate_channels(self) -> None:
+        self._channels = None
+
+    def invalidate_members(self) -> None:
+        self._members = None
+
+    @property
+    def admin_role_ids(self) -> FrozenSet[int]:
+        if self._admin_role_ids is None:
+            names = set(self._admin_role_names)
+            self._admin_role_ids = frozenset(r.id for r in self.guild.roles if r.name in names)
+        return self._admin_role_ids
+
+    def is_admin_member(self, member: discord.Member) -> bool:
+        if member.guild_permissions.administrator:
+            return True
+        return any(member.get_role(role_id) is not None for role_id in self.admin_role_ids)
+
+    def text_channel_by_name(self, name: str) -> Optional[discord.TextChannel]:
+        if self._channels is None:
+            index: Dict[str, discord.TextChannel] = {}
+            # guild.text_channels is sorted by position; the first match wins as before
+            for ch in self.guild.text_channels:
+                index.setdefault(normalize_channel_name(ch.name), ch)
+            self._channels = index
+        return self._channels.get(normalize_channel_name(name))
+
+    def member_choices(self, current: str, limit: int = 25) -> List[Tuple[str, int]]:
+        # (label, member_id) for autocomplete; sorted once, searched by prefix
+        if self._members is None:
+            self._members = sorted(
+                (m.display_name.lower(), m.id, f"{m.display_name} ({m.name})")
+                for m in self.guild.members if not m.bot
+            )
+        needle = current.strip().lower()
+        i = bisect.bisect_left(self._members, (needle,))
+        result = []
+        while i < len(self._members) and self._members[i][0].startswith(needle) and len(result) < limit:
+            result.append((self._members[i][2], self._members[i][1]))
+            i += 1
+        return result
+
+
+class GuildContextCache:
+    def __init__(self, role_ids: RoleIDs, admin_role_names: Iterable[str], scheduler: Optional[RequestScheduler] = None):
+        self.role_ids = role_ids
+        self.admin_role_names = tuple(admin_role_names)
+        self.scheduler = scheduler
+        self._contexts: Dict[int, GuildContext] = {}
+
+    def get(self, guild: discord.Guild) -> GuildContext:
+        ctx = self._contexts.get(guild.id)
+        if ctx is None or ctx.guild is not guild:
+            ctx = GuildContext(guild, self.role_ids, self.admin_role_names, self.scheduler)
+            self._contexts[guild.id] = ctx
+        return ctx
+
+    def reset(self, role_ids: RoleIDs, admin_role_names: Iterable[str]) -> None:
+        self.role_ids = role_ids
+        self.admin_role_names = tuple(admin_role_names)
+        self._contexts.clear()
+
+    def invalidate_roles(self, guild_id: int) -> None:
+        ctx = self._contexts.get(guild_id)
+        if ctx:
+            ctx.invalidate_roles()
+
+    def invalidate_channels(self, guild_id: int) -> None:
+        ctx = self._contexts.get(guild_id)
+        if ctx:
+            ctx.invalidate_channels()
+
+    def invalidate_members(self, guild_id: int) -> None:
+        ctx = self._contexts.get(guild_id)
+        if ctx:
+            ctx.invalidate_members()
+
+    def __len__(self) -> int:
+        return len(self._contexts)
@@ -1,18 +1,37 @@
 import os
 import re
 import asyncio
+import io
+import signal
+import time
+import tracemalloc
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 from dotenv import load_dotenv
 
-from utils.data_manager import DataManager, now_str
+from utils.activity_tracker import ActivityTracker
+from utils.audit_log import AuditLog, paginate, parse_log_file
+from utils.bot_config import BotConfig, ConfigError, ConfigWatcher
+from utils.command_guard import RETRY, DuplicateGuard, RateLimiter, RateQuota, ResponseCoalescer
+from utils.data_manager import ACTIVITY_ACTIVE, DATE_FMT, DataManager, now_str, roster_csv
+from utils.expiry_queue import Expiry, ExpiryQueue
+from utils.guild_context import GuildContextCache
 from utils.member_finder import find_member
-from utils.role_manager import RoleIDs, RoleManager
+from utils.memory_report import format_bytes, rss_bytes, tracemalloc_top
+from utils.message_purger import PurgeFilter, compile_pattern, filtered_purge
+from utils.request_scheduler import Priority, RequestScheduler
+from utils.role_manager import RoleIDs
+from utils.roster_index import RosterIndex
+from utils.snapshots import STAMP_FMT, SnapshotStore, take_snapshot_job
+from utils.warm_state import WarmState
+from utils.worker_pool import JobCancelled, WorkerPool
 
 # ===================== КОНФІГУРАЦІЯ / КОЛЬОРИ =====================
 # Яскраві узгоджені кольори
@@ -26,6 +45,9 @@ COLOR_DISMISSAL = 0xDC143C # 🟥 Звільнення (бордовий)
 COLOR_NEWS = 0x9370DB     # 🟣 Новини (фіолетови��)
 SEP = "────────────────────"
 
+# Значення нижче — за замовчуванням; config.json перевизначає їх без рестарту
+# (див. CONFIG_PATH, !reload_config)
+
 # Ідентифікатори ролей (замініть на власні)
 ROLE_IDS = RoleIDs(
     leader=123456789012345678,
@@ -43,6 +65,21 @@ ADMIN_ROLES = [
 # Шляхи до даних / логів
 DATA_PATH = os.path.join(os.path.dirname(__file__), "leaders_data.json")
 LOG_PATH = os.path.join(os.path.dirname(__file__), "bot_logs.txt")
+AUDIT_PATH = os.path.join(os.path.dirname(__file__), "audit_log.jsonl")
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "config.json")
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), "snapshots")
+WARM_STATE_PATH = os.path.join(os.path.dirname(__file__), "warm_state.json")
+
+# Зупинка (SIGTERM/SIGINT): скільки чекати завершення команд і черги запитів (сек)
+SHUTDOWN_DRAIN_SECONDS = 20
+
+# Знімки даних: період (хв) / скільки зберігати погодинних і щоденних
+SNAPSHOT_INTERVAL_MINUTES = 60
+SNAPSHOT_KEEP_HOURLY = 24
+SNAPSHOT_KEEP_DAILY = 14
+
+# Перевірка змін config.json (сек)
+CONFIG_POLL_SECONDS = 10
 
 # Префікс команд
 COMMAND_PREFIX = "!"
@@ -54,9 +91,62 @@ AUTO_DELETE_SECONDS = 8
 WARNINGS_PER_REPRIMAND = 5
 MAX_REPRIMANDS = 3
 
+# Термін дії покарань (дні, 0 — безстроково)
+WARNING_EXPIRY_DAYS = 30
+REPRIMAND_EXPIRY_DAYS = 90
+
 # Термін життя новин (год)
 NEWS_TTL_HOURS = 24
 
+# Новини: одночасних публікацій у різні канали / спроб при rate limit
+NEWS_FANOUT_CONCURRENCY = 3
+NEWS_SEND_RETRIES = 3
+NEWS_REACTIONS = ["✅", "❌", "📌"]
+
+# Обмеження частоти команд на користувача: {команда: RateQuota(burst, per_seconds)},
+# "default" — для решти команд
+RATE_LIMITS = {
+    "default": RateQuota(5, 10),
+    "clear": RateQuota(2, 60),
+    "export": RateQuota(1, 60),
+    "restore": RateQuota(1, 60),
+}
+# Повтор змінюючої команди (той самий автор і ціль) відхиляється протягом (сек)
+DUPLICATE_WINDOW_SECONDS = 5
+# Однакові команди читання в одному каналі отримують спільну відповідь (сек)
+COALESCE_WINDOW_SECONDS = 3
+# Скільки повторний виклик чекає на спільну відповідь (сек; слеш-команда має відповісти за 3 с)
+COALESCE_WAIT_SECONDS = 2
+# Лише команди без перевірки прав: відповідь не залежить від того, хто питає
+READ_ONLY_COMMANDS = frozenset({
+    "leaders", "deputies", "leader", "deputy", "news_list", "stats", "info", "help",
+})
+MUTATING_COMMANDS = frozenset({
+    "add_leader", "add_deputy", "remove_leader", "remove_deputy", "warning", "reprimand",
+    "news", "clear", "restore", "export",
+})
+# Для цих команд ціллю вважаються всі аргументи, а не перший
+FULL_ARGS_TARGET_COMMANDS = frozenset({"news", "clear"})
+
+# Активність: період збереження лічильників (хв) / поріг неактивності (дні)
+ACTIVITY_FLUSH_MINUTES = 5
+INACTIVE_AFTER_DAYS = 7
+
+# Очищення: максимум повідомлень за одну команду / переглянутих повідомлень історії
+CLEAR_MAX_AMOUNT = 10000
+CLEAR_MAX_SCAN = 20000
+
+# Журнал аудиту: записів на сторінку
+AUDIT_PAGE_SIZE = 10
+
+# Пул процесів для важких фонових задач (експорт, імпорт логів, знімки)
+WORKER_PROCESSES = 2
+WORKER_MAX_CONCURRENT_JOBS = 2
+
+# Черга вихідних запитів до Discord (один воркер завжди вільний для модерації/відповідей)
+SCHEDULER_WORKERS = 4
+SCHEDULER_RESERVED_WORKERS = 1
+
 # Інтенти
 intents = discord.Intents.default()
 intents.message_content = True
@@ -66,31 +156,224 @@ intents.guilds = True
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN", "")
 
-bot = commands.Bot(
-    command_prefix=COMMAND_PREFIX,
+# Слеш-команди: MESSAGE_CONTENT_INTENT=0 вимикає привілейований інтент — префіксні
+# команди тоді працюють лише через згадку бота (@Бот команда), решта — через /.
+# SYNC_COMMANDS=1 — синхронізувати дерево слеш-команд при старті.
+if os.getenv("MESSAGE_CONTENT_INTENT", "1") == "0":
+    intents.message_content = False
+SYNC_COMMANDS = os.getenv("SYNC_COMMANDS") == "1"
+
+# Профіль пам'яті (MEMORY_PROFILE у .env): "default" або "low".
+# low: без кешу повідомлень, без повного завантаження учасників при старті
+# (учасники довантажуються запитами), кешуються лише учасники у голосових каналах,
+# у пам'яті — лише останні події аудиту (старіші читаються з файлу).
+MEMORY_PROFILES = {
+    "default": {"max_messages": 1000, "chunk_guilds_at_startup": True, "member_cache": "all", "audit_events": None},
+    "low": {"max_messages": None, "chunk_guilds_at_startup": False, "member_cache": "voice", "audit_events": 5000},
+}
+MEMORY_PROFILE = os.getenv("MEMORY_PROFILE", "default").lower()
+if MEMORY_PROFILE not in MEMORY_PROFILES:
+    raise SystemExit(f"MEMORY_PROFILE має бути одним із: {', '.join(MEMORY_PROFILES)}")
+_memory = dict(MEMORY_PROFILES[MEMORY_PROFILE])
+
+
+def env_count(name: str) -> Optional[int]:
+    # Невід'ємне ціле зі змінної оточення; None, якщо її не задано
+    value = os.getenv(name)
+    if not value:
+        return None
+    if not value.strip().isdigit():
+        raise SystemExit(f"{name} має бути невід'ємним цілим числом (отримано {value!r})")
+    return int(value)
+
+
+# Точкові перевизначення: MAX_MESSAGES (0 — вимкнути кеш), MEMBER_CACHE (all|voice|none),
+# AUDIT_MAX_EVENTS (0 — усі події в пам'яті)
+if env_count("MAX_MESSAGES") is not None:
+    _memory["max_messages"] = env_count("MAX_MESSAGES") or None
+if env_count("AUDIT_MAX_EVENTS") is not None:
+    _memory["audit_events"] = env_count("AUDIT_MAX_EVENTS") or None
+if os.getenv("MEMBER_CACHE"):
+    _memory["member_cache"] = os.getenv("MEMBER_CACHE").lower()
+
+
+def member_cache_flags(mode: str) -> discord.MemberCacheFlags:
+    if mode == "all":
+        return discord.MemberCacheFlags.from_intents(intents)
+    if mode == "voice":
+        return discord.MemberCacheFlags(voice=True, joined=False)
+    if mode == "none":
+        return discord.MemberCacheFlags.none()
+    raise SystemExit("MEMBER_CACHE має бути all, voice або none")
+
+
+# TRACEMALLOC=1 — трасування алокацій з самого старту (для !mem)
+if os.getenv("TRACEMALLOC") == "1" and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+# Центральна черга вихідних запитів: модерація > відповіді > косметика
+SCHEDULER = RequestScheduler(workers=SCHEDULER_WORKERS, reserved_workers=SCHEDULER_RESERVED_WORKERS)
+
+
+class HorizontContext(commands.Context):
+    # Відповіді йдуть через чергу з пріоритетом REPLY, а delete_after стає
+    # косметичним видаленням, яке групується в bulk delete по каналу
+    coalesce_key = None
+    duplicate_key = None
+
+    async def send(self, content=None, **kwargs):
+        delete_after = kwargs.pop("delete_after", None)
+        msg = await SCHEDULER.submit(Priority.REPLY, lambda: super(HorizontContext, self).send(content, **kwargs))
+        if delete_after is not None:
+            SCHEDULER.delete_message(msg, delay=delete_after)
+        # Перша відповідь стає спільною для однакових команд у цьому каналі
+        if self.coalesce_key is not None:
+            COALESCER.resolve(self.coalesce_key, msg)
+        return msg
+
+    def mark_failed(self):
+        # Команда не виконала дію: повтор не є дублем, спільної відповіді немає
+        if self.duplicate_key is not None:
+            DUPLICATES.release(self.duplicate_key)
+            self.duplicate_key = None
+        if self.coalesce_key is not None:
+            COALESCER.discard(self.coalesce_key)
+            self.coalesce_key = None
+
+    async def fail(self, embed: discord.Embed):
+        # Відповідь про помилку / неправильне використання. Для слеш-команд
+        # (поки відповідь не відкладено) вона ефемерна і не потребує видалення
+        self.mark_failed()
+        if self.interaction is not None and not self.interaction.response.is_done():
+            return await self.send(embed=embed, ephemeral=True)
+        return await self.send(embed=embed, delete_after=AUTO_DELETE_SECONDS)
+
+
+class HorizontBot(commands.Bot):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._shutdown: Optional[asyncio.Future] = None
+
+    async def get_context(self, origin, *, cls=HorizontContext):
+        return await super().get_context(origin, cls=cls)
+
+    async def setup_hook(self):
+        # Виконується один раз до підключення до шлюзу (на відміну від on_ready)
+        await startup_runtime()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, lambda: loop.create_task(self.close()))
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: SIGINT обробляє bot.run
+        if SYNC_COMMANDS:
+            synced = await self.tree.sync()
+            print(f"Синхронізовано слеш-команд: {len(synced)}")
+
+    async def close(self):
+        # Спершу дочекатися команд і скинути стан, потім закрити з'єднання
+        if self._shutdown is None:
+            self._shutdown = asyncio.ensure_future(shutdown_runtime())
+        try:
+            await self._shutdown
+        except Exception as e:
+            print(f"Помилка при зупинці: {type(e).__name__}: {e}")
+        await super().close()
+
+
+bot = HorizontBot(
+    command_prefix=COMMAND_PREFIX if intents.message_content else commands.when_mentioned_or(COMMAND_PREFIX),
     intents=intents,
-    help_command=None  # ← ДОБАВЬТЕ ЭТО!
+    help_command=None,  # ← ДОБАВЬТЕ ЭТО!
+    max_messages=_memory["max_messages"],
+    member_cache_flags=member_cache_flags(_memory["member_cache"]),
+    chunk_guilds_at_startup=_memory["chunk_guilds_at_startup"],
 )
 
+# Кеш контекстів гільдій: ролі, ID адмін-ролей, індекс каналів
+GUILDS = GuildContextCache(ROLE_IDS, ADMIN_ROLES, SCHEDULER)
+
 # Менеджер даних
 DM = DataManager(DATA_PATH, LOG_PATH)
+# Структурований журнал аудиту (при першому запуску імпортує bot_logs.txt)
+AUDIT = AuditLog(AUDIT_PATH, LOG_PATH, max_events=_memory["audit_events"])
+# Лічильники активності керівників/заступників (пишуться у сховище пакетами)
+ACTIVITY = ActivityTracker([ROLE_IDS.leader, ROLE_IDS.deputy])
+# Індекс реєстру для автодоповнення слеш-команд
+ROSTER = RosterIndex(DM)
+# Знімки leaders_data.json; запис — у процесі пулу, по одному (SNAPSHOT_LOCK)
+SNAPSHOTS = SnapshotStore(SNAPSHOT_DIR, keep_hourly=SNAPSHOT_KEEP_HOURLY, keep_daily=SNAPSHOT_KEEP_DAILY)
+SNAPSHOT_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshots")
+SNAPSHOT_LOCK = asyncio.Lock()
+# Процеси для CPU/IO-важких задач — головний цикл лише чекає на результат
+POOL = WorkerPool(max_workers=WORKER_PROCESSES, max_concurrent_jobs=WORKER_MAX_CONCURRENT_JOBS)
+# Стан між перезапусками: заплановані видалення, нескинуті лічильники
+WARM = WarmState(WARM_STATE_PATH)
+# Захист від спаму та подвійних кліків
+LIMITER = RateLimiter(RATE_LIMITS)
+DUPLICATES = DuplicateGuard(DUPLICATE_WINDOW_SECONDS)
+COALESCER = ResponseCoalescer(COALESCE_WINDOW_SECONDS)
+
+
+# ===================== КОНФІГУРАЦІЯ З ФАЙЛУ =====================
+
+CONFIG_WATCHER = ConfigWatcher(CONFIG_PATH, BotConfig(
+    role_ids=ROLE_IDS,
+    admin_roles=tuple(ADMIN_ROLES),
+    warnings_per_reprimand=WARNINGS_PER_REPRIMAND,
+    max_reprimands=MAX_REPRIMANDS,
+    news_ttl_hours=NEWS_TTL_HOURS,
+    auto_delete_seconds=AUTO_DELETE_SECONDS,
+    warning_expiry_days=WARNING_EXPIRY_DAYS,
+    reprimand_expiry_days=REPRIMAND_EXPIRY_DAYS,
+    rate_limits=RATE_LIMITS,
+    duplicate_window_seconds=DUPLICATE_WINDOW_SECONDS,
+    coalesce_window_seconds=COALESCE_WINDOW_SECONDS,
+))
+
+
+def apply_config(cfg: BotConfig):
+    # Без await усередині — зміна атомарна для всіх обробників подій
+    global ROLE_IDS, ADMIN_ROLES, WARNINGS_PER_REPRIMAND, MAX_REPRIMANDS
+    global NEWS_TTL_HOURS, AUTO_DELETE_SECONDS, WARNING_EXPIRY_DAYS, REPRIMAND_EXPIRY_DAYS
+    global RATE_LIMITS, DUPLICATE_WINDOW_SECONDS, COALESCE_WINDOW_SECONDS
+    ROLE_IDS = cfg.role_ids
+    ADMIN_ROLES = list(cfg.admin_roles)
+    WARNINGS_PER_REPRIMAND = cfg.warnings_per_reprimand
+    MAX_REPRIMANDS = cfg.max_reprimands
+    NEWS_TTL_HOURS = cfg.news_ttl_hours
+    AUTO_DELETE_SECONDS = cfg.auto_delete_seconds
+    WARNING_EXPIRY_DAYS = cfg.warning_expiry_days
+    REPRIMAND_EXPIRY_DAYS = cfg.reprimand_expiry_days
+    RATE_LIMITS = cfg.rate_limits
+    DUPLICATE_WINDOW_SECONDS = cfg.duplicate_window_seconds
+    COALESCE_WINDOW_SECONDS = cfg.coalesce_window_seconds
+    LIMITER.set_quotas(RATE_LIMITS)
+    DUPLICATES.window = DUPLICATE_WINDOW_SECONDS
+    COALESCER.window = COALESCE_WINDOW_SECONDS
+    # Кешовані ролі / ID адмін-ролей більше не дійсні
+    GUILDS.reset(ROLE_IDS, ADMIN_ROLES)
+    ACTIVITY.tracked_role_ids = (ROLE_IDS.leader, ROLE_IDS.deputy)
+
+
+# Некоректний config.json при старті — зупиняємо бота з поясненням
+try:
+    apply_config(CONFIG_WATCHER.load())
+except ConfigError as e:
+    raise SystemExit(f"config.json: {e}")
 
 
 # ===================== ХЕЛПЕРИ / ДЕКОРАТОРИ =====================
 
 def is_admin():
     async def predicate(ctx: commands.Context):
-        if ctx.author.guild_permissions.administrator:
-            return True
-        author_roles = {r.name for r in getattr(ctx.author, 'roles', [])}
-        allowed = any(a in author_roles for a in ADMIN_ROLES)
+        if ctx.guild is None:
+            return False
+        allowed = GUILDS.get(ctx.guild).is_admin_member(ctx.author)
         if not allowed:
-            try:
-                await ctx.message.delete(delay=1)
-            except Exception:
-                pass
-            await ctx.send(
-                embed=discord.Embed(
+            await auto_purge(ctx)
+            await ctx.fail(
+                discord.Embed(
                     title="❌ Відмовлено у доступі",
                     description=(
                         "У вас немає дозволу використовувати цю команду.\n"
@@ -98,7 +381,6 @@ def is_admin():
                     ),
                     color=COLOR_ERROR,
                 ),
-                delete_after=AUTO_DELETE_SECONDS,
             )
         return allowed
     return commands.check(predicate)
@@ -113,17 +395,22 @@ def usage_error(usage: str) -> discord.Embed:
 
 
 async def auto_purge(ctx: commands.Context):
-    try:
-        await ctx.message.delete(delay=1)
-    except Exception:
-        pass
+    # У слеш-команд немає повідомлення-команди, яке треба прибрати
+    if ctx.interaction is None:
+        SCHEDULER.delete_message(ctx.message, delay=1)
+
+
+async def defer_if_slash(ctx: commands.Context):
+    # Довгі операції: відкладена відповідь, щоб не перевищити 3 с на відповідь взаємодії
+    if ctx.interaction is not None and not ctx.interaction.response.is_done():
+        await ctx.defer()
 
 
 async def resolve_member_or_reply(ctx: commands.Context, nickname: str) -> Optional[discord.Member]:
     member = await find_member(ctx.guild, nickname)
     if not member:
-        await ctx.send(
-            embed=discord.Embed(
+        await ctx.fail(
+            discord.Embed(
                 title="❌ Користувача не знайдено",
                 description=(
                     "Спробуйте варіанти: @Згадка, ID користувача, або точний нік/відображуване ім'я.\n"
@@ -131,11 +418,32 @@ async def resolve_member_or_reply(ctx: commands.Context, nickname: str) -> Optio
                 ),
                 color=COLOR_ERROR,
             ),
-            delete_after=AUTO_DELETE_SECONDS,
         )
     return member
 
 
+def log_event(message: str, actor: Optional[str], action: str, target: Optional[str] = None, **details):
+    # Текстовий лог + структурована подія аудиту
+    DM.log(message)
+    try:
+        AUDIT.record(actor, action, target, **details)
+    except Exception:
+        pass
+
+
+def parse_date_arg(value: str, end_of_day: bool = False) -> Optional[float]:
+    # Формати: 16.12.2025 або 16.12.2025-21:00
+    for fmt in (DATE_FMT.replace(" ", "-"), "%d.%m.%Y"):
+        try:
+            dt = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        if end_of_day and fmt == "%d.%m.%Y":
+            dt = dt.replace(hour=23, minute=59, second=59)
+        return dt.timestamp()
+    return None
+
+
 def _(s: str) -> str:
     # Простий аліас для можливого майбутнього i18n
     return s
@@ -145,19 +453,178 @@ def _(s: str) -> str:
 
 @bot.event
 async def on_ready():
-    DM.set_start_time()
+    # Викликається і після кожного перепідключення — лише ідемпотентні дії
     print(f"Увійшов як {bot.user} (id: {bot.user.id})")
-    cleanup_news_task.start()
+    restore_deletions()
+    resume_voice_sessions()
     await bot.change_presence(activity=discord.Game(name="Horizont RP • Керування сервером"))
 
 
 @bot.event
 async def on_command_completion(ctx: commands.Context):
-    # Підрахунок виконаних команд
-    try:
-        DM.increment_commands()
-    except Exception:
-        pass
+    count_command()
+
+
+@bot.check
+async def not_shutting_down(ctx: commands.Context):
+    if SHUTTING_DOWN:
+        raise ShuttingDown()
+    return True
+
+
+# ---- Обмеження частоти / об'єднання однакових команд ----
+class RateLimited(commands.CheckFailure):
+    def __init__(self, retry_after: float, notify: bool):
+        super().__init__(f"rate limited for {retry_after:.1f}s")
+        self.retry_after = retry_after
+        self.notify = notify
+
+
+class DuplicateCommand(commands.CheckFailure):
+    def __init__(self, target: str, retry_after: float):
+        super().__init__(f"duplicate command for {target!r}")
+        self.target = target
+        self.retry_after = retry_after
+
+
+class Coalesced(commands.CheckFailure):
+    def __init__(self, shared: asyncio.Future):
+        super().__init__("coalesced with an identical command")
+        self.shared = shared
+
+
+def raw_command_args(ctx: commands.Context) -> str:
+    # Глобальні перевірки виконуються до розбору аргументів — беремо сирий текст
+    if ctx.interaction is not None:
+        namespace = ctx.interaction.namespace
+        raw = " ".join(str(getattr(namespace, name, None) or "") for name in ctx.command.clean_params)
+    else:
+        raw = ctx.view.buffer[ctx.view.index:]
+    return " ".join(raw.lower().split())
+
+
+@bot.check
+async def guard_command(ctx: commands.Context):
+    if ctx.guild is None or ctx.command is None:
+        return True
+    name = ctx.command.qualified_name
+    args = raw_command_args(ctx)
+    # Токен береться і для викликів, що отримають спільну відповідь, — інакше
+    # спам однаковою командою обходив би ліміт
+    retry_after, notify = LIMITER.acquire(ctx.author.id, name)
+    if retry_after:
+        raise RateLimited(retry_after, notify)
+    if name in READ_ONLY_COMMANDS:
+        coalesce_key = (ctx.channel.id, name, args)
+        shared = COALESCER.join(coalesce_key)
+        while shared is not None:
+            # Якщо перший виклик не вдався (RETRY) — виконуємо команду самі
+            try:
+                result = await asyncio.wait_for(asyncio.shield(shared), COALESCE_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                raise Coalesced(shared)
+            if result is not RETRY:
+                raise Coalesced(shared)
+            shared = COALESCER.join(coalesce_key)
+        ctx.coalesce_key = coalesce_key
+    if name in MUTATING_COMMANDS and args:
+        target = args if name in FULL_ARGS_TARGET_COMMANDS else args.split(" ", 1)[0]
+        key = (ctx.author.id, name, target)
+        remaining = DUPLICATES.check(key)
+        if remaining:
+            raise DuplicateCommand(target, remaining)
+        ctx.duplicate_key = key
+    return True
+
+
+@bot.before_invoke
+async def track_inflight(ctx: commands.Context):
+    INFLIGHT.add(ctx)
+
+
+@bot.after_invoke
+async def untrack_inflight(ctx: commands.Context):
+    INFLIGHT.discard(ctx)
+
+
+# Активність: лише інкремент лічильників у пам'яті
+@bot.listen("on_message")
+async def track_message_activity(message: discord.Message):
+    if message.guild is None or message.author.bot or not isinstance(message.author, discord.Member):
+        return
+    if ACTIVITY.is_tracked(message.author):
+        ACTIVITY.record_message(message.author)
+
+
+@bot.event
+async def on_voice_state_update(member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+    if member.bot or before.channel == after.channel:
+        return
+    if after.channel is not None and ACTIVITY.is_tracked(member):
+        ACTIVITY.voice_join(member)
+    elif after.channel is None:
+        ACTIVITY.voice_leave(member)
+
+
+@bot.event
+async def on_disconnect():
+    global LAST_DISCONNECT
+    if LAST_DISCONNECT is None:
+        LAST_DISCONNECT = time.time()
+
+
+@bot.event
+async def on_resumed():
+    # Сесію відновлено (RESUME): пропущені події доставлено, on_ready не буде
+    global LAST_DISCONNECT
+    LAST_DISCONNECT = None
+
+
+# Інвалідація кешу контексту гільдії
+@bot.event
+async def on_member_join(member: discord.Member):
+    GUILDS.invalidate_members(member.guild.id)
+
+
+@bot.event
+async def on_member_remove(member: discord.Member):
+    GUILDS.invalidate_members(member.guild.id)
+
+
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    if before.display_name != after.display_name:
+        GUILDS.invalidate_members(after.guild.id)
+
+
+@bot.event
+async def on_guild_role_create(role: discord.Role):
+    GUILDS.invalidate_roles(role.guild.id)
+
+
+@bot.event
+async def on_guild_role_delete(role: discord.Role):
+    GUILDS.invalidate_roles(role.guild.id)
+
+
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    GUILDS.invalidate_roles(after.guild.id)
+
+
+@bot.event
+async def on_guild_channel_create(channel: discord.abc.GuildChannel):
+    GUILDS.invalidate_channels(channel.guild.id)
+
+
+@bot.event
+async def on_guild_channel_delete(channel: discord.abc.GuildChannel):
+    GUILDS.invalidate_channels(channel.guild.id)
+
+
+@bot.event
+async def on_guild_channel_update(before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+    GUILDS.invalidate_channels(after.guild.id)
 
 
 # ===================== ПЛАНУВАЛЬНИКИ =====================
@@ -166,15 +633,262 @@ async def on_command_completion(ctx: commands.Context):
 async def cleanup_news_task():
     removed = DM.cleanup_news(older_than_minutes=NEWS_TTL_HOURS * 60)
     if removed:
-        DM.log(f"Auto-cleanup removed {removed} old news entries")
+        log_event(f"Auto-cleanup removed {removed} old news entries", None, "news_cleanup", count=removed)
+
+
+def count_command():
+    # Лічильник команд у пам'яті; у сховище — разом з активністю
+    global PENDING_COMMANDS
+    PENDING_COMMANDS += 1
+
+
+def flush_activity() -> int:
+    global PENDING_COMMANDS
+    updates = ACTIVITY.drain()
+    try:
+        matched = DM.apply_activity(updates, inactive_after_days=INACTIVE_AFTER_DAYS)
+    except Exception:
+        # Не втрачаємо лічильники: наступний flush або warm-state
+        ACTIVITY.restore(updates)
+        raise
+    if PENDING_COMMANDS:
+        count, PENDING_COMMANDS = PENDING_COMMANDS, 0
+        try:
+            DM.increment_commands(count)
+        except Exception:
+            PENDING_COMMANDS += count
+            raise
+    return matched
+
+
+@tasks.loop(minutes=ACTIVITY_FLUSH_MINUTES)
+async def activity_flush_task():
+    # Помилка не повинна зупинити цикл: лічильники вже повернуто в пам'ять,
+    # наступний тік повторить запис
+    try:
+        flush_activity()
+    except Exception as e:
+        DM.log(f"Activity flush failed: {type(e).__name__}: {e}")
+
+
+@tasks.loop(seconds=CONFIG_POLL_SECONDS)
+async def config_watch_task():
+    try:
+        cfg = CONFIG_WATCHER.check()
+    except ConfigError as e:
+        DM.log(f"Config reload failed: {e}")
+        return
+    if cfg:
+        apply_config(cfg)
+        log_event("Config reloaded from config.json", None, "config_reload")
+
+
+# ===================== ФОНОВІ ЗАДАЧІ =====================
+
+def start_audit_backfill():
+    # Одноразовий імпорт bot_logs.txt у журнал аудиту — у процесі пулу
+    if not AUDIT.pending_backfill or any(j.name == "audit-backfill" for j in POOL.active_jobs()):
+        return
+    job = POOL.submit("audit-backfill", parse_log_file, AUDIT.pending_backfill, AUDIT.backfill_limit)
+
+    def done(task: asyncio.Task):
+        if task.cancelled() or task.exception():
+            DM.log(f"Audit backfill failed: {task.exception() if not task.cancelled() else 'cancelled'}")
+            return
+        imported = AUDIT.import_events(task.result())
+        DM.log(f"Audit backfill imported {imported} events")
+    job.future.add_done_callback(done)
+
+
+# ===================== ЗНІМКИ ДАНИХ =====================
+
+async def run_in_snapshot_thread(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(SNAPSHOT_EXECUTOR, func, *args)
+
+
+async def take_snapshot(pre_restore: bool = False) -> Optional[str]:
+    # Копія читається синхронно (узгоджений стан), серіалізація і стиснення — у процесі пулу.
+    # Знімки не виконуються паралельно: щогодинний і перед відновленням ділили б мітку і prune()
+    async with SNAPSHOT_LOCK:
+        data = DM.load()
+        job = POOL.submit(
+            "snapshot", take_snapshot_job,
+            SNAPSHOTS.directory, SNAPSHOTS.keep_hourly, SNAPSHOTS.keep_daily, data, pre_restore,
+        )
+        return await job.future
+
+
+@tasks.loop(minutes=SNAPSHOT_INTERVAL_MINUTES)
+async def snapshot_task():
+    try:
+        await take_snapshot()
+    except Exception as e:
+        DM.log(f"Snapshot failed: {type(e).__name__}: {e}")
+
+
+# ===================== ТЕРМІН ДІЇ ПОКАРАНЬ =====================
+
+def punishment_ttl_seconds() -> dict:
+    return {
+        "warnings": WARNING_EXPIRY_DAYS * 86400 or None,
+        "reprimands": REPRIMAND_EXPIRY_DAYS * 86400 or None,
+    }
+
+
+def punishment_expires_at(kind: str) -> Optional[float]:
+    ttl = punishment_ttl_seconds()[kind]
+    return time.time() + ttl if ttl else None
+
+
+async def find_roster_member(category: str, nickname: str) -> Optional[discord.Member]:
+    # Лише надійна ідентифікація: member_id, а для старих записів без ID —
+    # точний збіг відображуваного імені. Частковий пошук (find_member) міг би
+    # змінити ролі іншого учасника, якщо цей вже покинув сервер.
+    info = DM.get_person(category, nickname) or {}
+    member_id = info.get("member_id")
+    for guild in bot.guilds:
+        if member_id:
+            member = guild.get_member(member_id)
+            if member is None and not guild.chunked:
+                try:
+                    member = await guild.fetch_member(member_id)
+                except discord.HTTPException:
+                    member = None
+        else:
+            candidates = guild.members if guild.chunked else await guild.query_members(query=nickname, limit=10)
+            member = discord.utils.get(candidates, display_name=nickname)
+        if member:
+            return member
+    return None
+
+
+def roster_member_id(category: str, nickname: str) -> Optional[int]:
+    info = DM.get_person(category, nickname) or {}
+    return info.get("member_id")
+
+
+async def on_punishment_expired(expiry: Expiry):
+    # Черга стартує у setup_hook — ролі можна змінювати лише після кешу гільдій
+    await bot.wait_until_ready()
+    remaining = DM.expire_punishments(expiry.category, expiry.nickname, expiry.kind, expiry.at)
+    if remaining is None:
+        return
+    if expiry.kind == "warnings":
+        log_event(f"Термін дії ПОПЕРЕДЖЕННЯ {expiry.nickname} минув (залишилось {remaining})", None, "warning_expired", expiry.nickname, member_id=roster_member_id(expiry.category, expiry.nickname), count=remaining)
+        return
+    # Догана минула: понижуємо роль reprimand_2 → reprimand_1 → без ролі
+    member = await find_roster_member(expiry.category, expiry.nickname)
+    if member:
+        rm = GUILDS.get(member.guild).role_manager
+        if remaining == 0:
+            await rm.clear_punishment_roles(member)
+        else:
+            await rm.apply_reprimand_role(member, remaining)
+    log_event(f"Термін дії ДОГАНИ {expiry.nickname} минув (залишилось {remaining})", None, "reprimand_expired", expiry.nickname, member_id=roster_member_id(expiry.category, expiry.nickname), count=remaining)
+
+
+EXPIRY = ExpiryQueue(on_punishment_expired, log=DM.log)
+
+
+def start_expiry_engine():
+    # Відновлення черги після рестарту: терміни зберігаються у самих записах
+    if EXPIRY.running:
+        return
+    EXPIRY.load(Expiry(**p) for p in DM.backfill_expiries(punishment_ttl_seconds()))
+    EXPIRY.start()
+
+
+# ===================== ЖИТТЄВИЙ ЦИКЛ =====================
+
+class ShuttingDown(commands.CheckFailure):
+    pass
+
+
+SHUTTING_DOWN = False
+# Час першого розриву з'єднання після останнього on_ready / on_resumed
+LAST_DISCONNECT: Optional[float] = None
+# Команди, що виконуються зараз (чекаємо на них при зупинці)
+INFLIGHT = set()
+PENDING_COMMANDS = 0
+# Видалення з warm-state; плануються після першого on_ready (потрібен кеш каналів)
+WARM_DELETIONS: List[List[float]] = []
+BACKGROUND_LOOPS = (cleanup_news_task, activity_flush_task, config_watch_task, snapshot_task)
+
+
+async def startup_runtime():
+    global PENDING_COMMANDS
+    await asyncio.get_running_loop().run_in_executor(None, DM.set_start_time)
+    state = WARM.consume()
+    if state:
+        ACTIVITY.restore(state.get("activity", []))
+        PENDING_COMMANDS += int(state.get("commands", 0))
+        WARM_DELETIONS.extend(state.get("deletions", []))
+        DM.log(f"Warm start: {len(WARM_DELETIONS)} scheduled deletions, {len(state.get('activity', []))} activity entries restored")
+    # Ідемпотентно: повторний виклик не перезапускає вже активні цикли
+    for loop_task in BACKGROUND_LOOPS:
+        if not loop_task.is_running():
+            loop_task.start()
+    start_expiry_engine()
+    start_audit_backfill()
+
+
+def restore_deletions():
+    now = time.time()
+    while WARM_DELETIONS:
+        channel_id, message_id, due, priority = WARM_DELETIONS.pop()
+        channel = bot.get_channel(int(channel_id)) or bot.get_partial_messageable(int(channel_id))
+        SCHEDULER.delete_message(channel.get_partial_message(int(message_id)), delay=max(1.0, due - now), priority=Priority(priority))
+
+
+def resume_voice_sessions():
+    # Учасники, що вже сиділи у войсі до рестарту, не дадуть on_voice_state_update;
+    # ті, хто вийшов, поки бот був відключений, — не дадуть voice_leave
+    global LAST_DISCONNECT
+    present = set()
+    for guild in bot.guilds:
+        for channel in guild.voice_channels + guild.stage_channels:
+            for member in channel.members:
+                if not member.bot and ACTIVITY.is_tracked(member):
+                    ACTIVITY.voice_join(member)
+                    present.add(member.id)
+    ACTIVITY.close_missing_sessions(present, LAST_DISCONNECT)
+    LAST_DISCONNECT = None
+
+
+async def shutdown_runtime():
+    global SHUTTING_DOWN
+    SHUTTING_DOWN = True
+    DM.log(f"Shutdown: waiting for {len(INFLIGHT)} running commands")
+    deadline = time.monotonic() + SHUTDOWN_DRAIN_SECONDS
+    while INFLIGHT and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+    for loop_task in BACKGROUND_LOOPS:
+        loop_task.cancel()
+    await EXPIRY.stop()
+    if not await SCHEDULER.drain(timeout=max(1.0, deadline - time.monotonic())):
+        DM.log("Shutdown: request queue not fully drained")
+    deletions = SCHEDULER.delayed_deletes()
+    SCHEDULER.cancel_delayed()
+    try:
+        flush_activity()
+    except Exception as e:
+        DM.log(f"Shutdown: activity flush failed, keeping it in warm state: {e}")
+    try:
+        WARM.save(deletions, activity=ACTIVITY.drain() if ACTIVITY.pending_count() else [], commands=PENDING_COMMANDS)
+    except OSError as e:
+        DM.log(f"Shutdown: warm state not saved: {e}")
+    await SCHEDULER.stop()
+    POOL.shutdown()
+    SNAPSHOT_EXECUTOR.shutdown(wait=True)
+    DM.log(f"Shutdown complete ({len(deletions)} scheduled deletions saved)")
 
 
 # ===================== ПЕРЕВІРКИ РОЛЕЙ =====================
 
 async def check_role_hierarchy(ctx: commands.Context, member: discord.Member) -> bool:
     if ctx.guild.me.top_role <= member.top_role:
-        await ctx.send(
-            embed=discord.Embed(
+        await ctx.fail(
+            discord.Embed(
                 title="❌ Проблема ієрархії ролей",
                 description=(
                     "Моя роль повинна бути ВИЩЕ за ролі цільового учасника, щоб керувати його ролями.\n"
@@ -182,7 +896,6 @@ async def check_role_hierarchy(ctx: commands.Context, member: discord.Member) ->
                 ),
                 color=COLOR_ERROR,
             ),
-            delete_after=AUTO_DELETE_SECONDS,
         )
         return False
     return True
@@ -194,7 +907,7 @@ async def check_role_hierarchy(ctx: commands.Context, member: discord.Member) ->
 @is_admin()
 async def check_roles(ctx: commands.Context):
     await auto_purge(ctx)
-    rm = RoleManager(ctx.guild, ROLE_IDS)
+    rm = GUILDS.get(ctx.guild).role_manager
     ok = await rm.ensure_roles_exist()
     color = COLOR_SUCCESS if ok else COLOR_ERROR
     title = "✅ Перевірка ролей" if ok else "❌ Перевірка ролей"
@@ -205,18 +918,19 @@ async def check_roles(ctx: commands.Context):
 # ---- Додавання керівника/заступника ----
 async def add_person(ctx: commands.Context, category: str, nickname: str, організація: str, посада: str):
     await auto_purge(ctx)
+    await defer_if_slash(ctx)
     member = await resolve_member_or_reply(ctx, nickname)
     if not member:
         return
     if not await check_role_hierarchy(ctx, member):
         return
 
-    rm = RoleManager(ctx.guild, ROLE_IDS)
+    rm = GUILDS.get(ctx.guild).role_manager
 
     other_category = "deputies" if category == "leaders" else "leaders"
     # Перевірка дубля у своїй категорії (по відображуваному ніку)
     if DM.get_person(category, member.display_name):
-        await ctx.send(embed=usage_error("додати_керівника [нік] [організація] [посада]" if category=="leaders" else "додати_заступника [нік] [організація] [посада]"), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(usage_error("додати_керівника [нік] [організація] [посада]" if category=="leaders" else "додати_заступника [нік] [організація] [посада]"))
         return
 
     # Прибираємо роль протилежної категорії та покарання
@@ -238,13 +952,17 @@ async def add_person(ctx: commands.Context, category: str, nickname: str, орг
         "посада": посада,
         "appointment_date": now_str(),
         "appointed_by": str(ctx.author),
+        "member_id": member.id,
         "warnings": [],
         "reprimands": [],
-        "activity": "Актив��ий",
+        "activity": ACTIVITY_ACTIVE,
         "last_activity": now_str(),
     }
     DM.set_person(category, member.display_name, info)
-    DM.log(f"{ctx.author} додав(ла) {member} як {('керівника' if category=='leaders' else 'заступника')} у {організація} - {посада}")
+    log_event(
+        f"{ctx.author} додав(ла) {member} як {('керівника' if category=='leaders' else 'заступника')} у {організація} - {посада}",
+        str(ctx.author), "add_person", member.display_name, member_id=member.id, category=category, org=організація, position=посада,
+    )
 
     embed = discord.Embed(
         title="✅ Успішно",
@@ -257,20 +975,22 @@ async def add_person(ctx: commands.Context, category: str, nickname: str, орг
     await ctx.send(embed=embed, delete_after=AUTO_DELETE_SECONDS)
 
 
-@bot.command(name="add_leader", aliases=["додати_керівника", "дк"]) 
+@bot.hybrid_command(name="add_leader", aliases=["додати_керівника", "дк"], description="Призначити керівника") 
+@app_commands.describe(nickname="Учасник", організація="Організація", посада="Посада")
 @is_admin()
 async def add_leader(ctx: commands.Context, nickname: str = None, організація: str = None, *, посада: str = None):
     if not (nickname and організація and посада):
-        await ctx.send(embed=usage_error("додати_керівника [нік] [організація] [посада]"), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(usage_error("додати_керівника [нік] [організація] [посада]"))
         return
     await add_person(ctx, "leaders", nickname, організація, посада)
 
 
-@bot.command(name="add_deputy", aliases=["додати_��аступника", "дз"]) 
+@bot.hybrid_command(name="add_deputy", aliases=["додати_��аступника", "дз"], description="Призначити заступника") 
+@app_commands.describe(nickname="Учасник", організація="Організація", посада="Посада")
 @is_admin()
 async def add_deputy(ctx: commands.Context, nickname: str = None, організація: str = None, *, посада: str = None):
     if not (nickname and організація and посада):
-        await ctx.send(embed=usage_error("додати_заступника [нік] [організація] [посада]"), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(usage_error("додати_заступника [нік] [організація] [посада]"))
         return
     await add_person(ctx, "deputies", nickname, організація, посада)
 
@@ -278,12 +998,13 @@ async def add_deputy(ctx: commands.Context, nickname: str = None, організ
 # ---- Видалення керівника/заступника ----
 async def remove_person(ctx: commands.Context, category: str, nickname: str):
     await auto_purge(ctx)
+    await defer_if_slash(ctx)
     member = await resolve_member_or_reply(ctx, nickname)
     if not member:
         return
     if not await check_role_hierarchy(ctx, member):
         return
-    rm = RoleManager(ctx.guild, ROLE_IDS)
+    rm = GUILDS.get(ctx.guild).role_manager
 
     ok = DM.remove_person(category, member.display_name)
     await rm.clear_punishment_roles(member)
@@ -293,26 +1014,31 @@ async def remove_person(ctx: commands.Context, category: str, nickname: str):
         await rm.remove_role(member, ROLE_IDS.deputy)
 
     if ok:
-        DM.log(f"{ctx.author} видалив(ла) {member} із {('керівників' if category=='leaders' else 'заступників')}")
+        log_event(
+            f"{ctx.author} видалив(ла) {member} із {('керівників' if category=='leaders' else 'заступників')}",
+            str(ctx.author), "remove_person", member.display_name, member_id=member.id, category=category,
+        )
         await ctx.send(embed=discord.Embed(title="✅ В��далено", description=f"{member.mention} видалено та ролі очищено.\n{SEP}", color=COLOR_SUCCESS), delete_after=AUTO_DELETE_SECONDS)
     else:
-        await ctx.send(embed=discord.Embed(title="⚠️ Не знайдено", description=f"{member.mention} не зареєстрований як {('керівник' if category=='leaders' else 'заступник')}.\n{SEP}", color=COLOR_WARNING), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(discord.Embed(title="⚠️ Не знайдено", description=f"{member.mention} не зареєстрований як {('керівник' if category=='leaders' else 'заступник')}.\n{SEP}", color=COLOR_WARNING))
 
 
-@bot.command(name="remove_leader", aliases=["видалити_керівника"]) 
+@bot.hybrid_command(name="remove_leader", aliases=["видалити_керівника"], description="Видалити керівника") 
+@app_commands.describe(nickname="Керівник")
 @is_admin()
 async def remove_leader(ctx: commands.Context, nickname: str = None):
     if not nickname:
-        await ctx.send(embed=usage_error("видалити_керівника [нік]"), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(usage_error("видалити_керівника [нік]"))
         return
     await remove_person(ctx, "leaders", nickname)
 
 
-@bot.command(name="remove_deputy", aliases=["видалити_заступника"]) 
+@bot.hybrid_command(name="remove_deputy", aliases=["видалити_заступника"], description="Видалити заступника") 
+@app_commands.describe(nickname="Заступник")
 @is_admin()
 async def remove_deputy(ctx: commands.Context, nickname: str = None):
     if not nickname:
-        await ctx.send(embed=usage_error("видалити_заступника [нік]"), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(usage_error("видалити_заступника [нік]"))
         return
     await remove_person(ctx, "deputies", nickname)
 
@@ -335,7 +1061,7 @@ def group_by_org(category: str):
     return grouped
 
 
-@bot.command(name="leaders", aliases=["керівники"]) 
+@bot.hybrid_command(name="leaders", aliases=["керівники"], description="Список керівників") 
 async def leaders(ctx: commands.Context):
     data = group_by_org("leaders")
     if not data:
@@ -348,7 +1074,7 @@ async def leaders(ctx: commands.Context):
     await ctx.send(embed=embed)
 
 
-@bot.command(name="deputies", aliases=["заступники"]) 
+@bot.hybrid_command(name="deputies", aliases=["заступники"], description="Список заступників") 
 async def deputies(ctx: commands.Context):
     data = group_by_org("deputies")
     if not data:
@@ -375,27 +1101,29 @@ def person_embed(nickname: str, info: dict, title: str) -> discord.Embed:
     return embed
 
 
-@bot.command(name="leader", aliases=["керівник"]) 
+@bot.hybrid_command(name="leader", aliases=["керівник"], description="Інформація про керівника") 
+@app_commands.describe(nickname="Керівник")
 async def leader(ctx: commands.Context, *, nickname: str = None):
     if not nickname:
-        await ctx.send(embed=usage_error("керівник [нік]"), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(usage_error("керівник [нік]"))
         return
     # Пошук по двох варіантах ключа (з пропусками/підкресленнями)
     info = DM.get_person("leaders", nickname) or DM.get_person("leaders", nickname.replace(" ", "_"))
     if not info:
-        await ctx.send(embed=discord.Embed(title="⚠️ Не знайдено", description=f"Керівника не знайдено.\n{SEP}", color=COLOR_WARNING), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(discord.Embed(title="⚠️ Не знайдено", description=f"Керівника не знайдено.\n{SEP}", color=COLOR_WARNING))
         return
     await ctx.send(embed=person_embed(nickname, info, "👑 Інформація про керівника"))
 
 
-@bot.command(name="deputy", aliases=["заступник"]) 
+@bot.hybrid_command(name="deputy", aliases=["заступник"], description="Інформація про заступника") 
+@app_commands.describe(nickname="Заступник")
 async def deputy(ctx: commands.Context, *, nickname: str = None):
     if not nickname:
-        await ctx.send(embed=usage_error("заступник [нік]"), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(usage_error("заступник [нік]"))
         return
     info = DM.get_person("deputies", nickname) or DM.get_person("deputies", nickname.replace(" ", "_"))
     if not info:
-        await ctx.send(embed=discord.Embed(title="⚠️ Не знайдено", description=f"Заступника не знайдено.\n{SEP}", color=COLOR_WARNING), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(discord.Embed(title="⚠️ Не знайдено", description=f"Заступника не знайдено.\n{SEP}", color=COLOR_WARNING))
         return
     await ctx.send(embed=person_embed(nickname, info, "🛡️ Інформація про заступника"))
 
@@ -417,34 +1145,40 @@ def detect_category(nickname: str) -> Tuple[Optional[str], Optional[dict]]:
     return None, None
 
 
-@bot.command(name="warning", aliases=["попередження"]) 
+@bot.hybrid_command(name="warning", aliases=["попередження"], description="Видати попередження") 
+@app_commands.describe(nickname="Керівник або заступник", reason="Причина")
 @is_admin()
 async def warning(ctx: commands.Context, nickname: str = None, *, reason: str = None):
     await auto_purge(ctx)
     if not (nickname and reason):
-        await ctx.send(embed=usage_error("попередження [нік] [причина]"), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(usage_error("попередження [нік] [причина]"))
         return
 
     category, info = detect_category(nickname)
     if not category:
-        await ctx.send(embed=discord.Embed(title="⚠️ Не зареєстровано", description=f"Ціль не є керівником/заступником.\n{SEP}", color=COLOR_WARNING), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(discord.Embed(title="⚠️ Не зареєстровано", description=f"Ціль не є керівником/заступником.\n{SEP}", color=COLOR_WARNING))
         return
 
-    count = DM.add_warning(category, nickname if info else nickname.replace(" ", "_"), reason, str(ctx.author))
-    DM.log(f"{ctx.author} видав(ла) ПОПЕРЕДЖЕННЯ {nickname}: {reason} (разом {count})")
+    key = nickname if info else nickname.replace(" ", "_")
+    expires_at = punishment_expires_at("warnings")
+    count = DM.add_warning(category, key, reason, str(ctx.author), expires_at=expires_at)
+    if count and expires_at:
+        EXPIRY.schedule(Expiry(expires_at, category, key, "warnings"))
+    log_event(f"{ctx.author} видав(ла) ПОПЕРЕДЖЕННЯ {nickname}: {reason} (разом {count})", str(ctx.author), "warning", key, member_id=info.get("member_id"), reason=reason, count=count)
 
     embed = discord.Embed(title="⚠️ Попередження", description=f"{nickname} отримав(ла) попередження. Разом: **{count}**\n{SEP}", color=COLOR_WARNING)
     await ctx.send(embed=embed, delete_after=AUTO_DELETE_SECONDS)
 
     if count >= WARNINGS_PER_REPRIMAND:
-        DM.clear_warnings(category, nickname if info else nickname.replace(" ", "_"))
+        DM.clear_warnings(category, key)
         await reprimand_impl(ctx, nickname, reason=f"Авто-конвертація з {WARNINGS_PER_REPRIMAND} попереджень")
 
 
 async def reprimand_impl(ctx: commands.Context, nickname: str, reason: str):
+    await defer_if_slash(ctx)
     category, info = detect_category(nickname)
     if not category:
-        await ctx.send(embed=discord.Embed(title="⚠️ Не зареєстровано", description=f"Ціль не є керівником/заступником.\n{SEP}", color=COLOR_WARNING), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(discord.Embed(title="⚠️ Не зареєстровано", description=f"Ціль не є керівником/заступником.\n{SEP}", color=COLOR_WARNING))
         return
     # Отримати учасника
     member = await resolve_member_or_reply(ctx, nickname)
@@ -453,8 +1187,12 @@ async def reprimand_impl(ctx: commands.Context, nickname: str, reason: str):
     if not await check_role_hierarchy(ctx, member):
         return
 
-    count = DM.add_reprimand(category, nickname if info else nickname.replace(" ", "_"), reason, str(ctx.author))
-    rm = RoleManager(ctx.guild, ROLE_IDS)
+    key = nickname if info else nickname.replace(" ", "_")
+    expires_at = punishment_expires_at("reprimands")
+    count = DM.add_reprimand(category, key, reason, str(ctx.author), expires_at=expires_at)
+    if count and expires_at and count < MAX_REPRIMANDS:
+        EXPIRY.schedule(Expiry(expires_at, category, key, "reprimands"))
+    rm = GUILDS.get(ctx.guild).role_manager
 
     if count >= MAX_REPRIMANDS:
         # Звільнення
@@ -464,7 +1202,7 @@ async def reprimand_impl(ctx: commands.Context, nickname: str, reason: str):
         else:
             await rm.remove_role(member, ROLE_IDS.deputy)
         DM.remove_person(category, member.display_name)
-        DM.log(f"{ctx.author} ЗВІЛЬНИВ(ЛА) {nickname} через 3 догани. Причина: {reason}")
+        log_event(f"{ctx.author} ЗВІЛЬНИВ(ЛА) {nickname} через 3 догани. Причина: {reason}", str(ctx.author), "dismissal", key, member_id=member.id, reason=reason)
         embed = discord.Embed(
             title="🟥 Звільнення",
             description=f"{nickname} звільнено через 3 догани.\n{SEP}",
@@ -475,19 +1213,20 @@ async def reprimand_impl(ctx: commands.Context, nickname: str, reason: str):
 
     # Призначення ролей за прогресією
     await rm.apply_reprimand_role(member, count)
-    DM.log(f"{ctx.author} видав(ла) ДОГАНУ №{count} {nickname}: {reason}")
+    log_event(f"{ctx.author} видав(ла) ДОГАНУ №{count} {nickname}: {reason}", str(ctx.author), "reprimand", key, member_id=member.id, reason=reason, count=count)
 
     color = COLOR_REP_1 if count == 1 else COLOR_REP_2
     embed = discord.Embed(title=f"🟧 Догана №{count}", description=f"{nickname} отримав(ла) догану. Причина: _{reason}_\n{SEP}", color=color)
     await ctx.send(embed=embed, delete_after=AUTO_DELETE_SECONDS)
 
 
-@bot.command(name="reprimand", aliases=["догана"]) 
+@bot.hybrid_command(name="reprimand", aliases=["догана"], description="Видати догану") 
+@app_commands.describe(nickname="Керівник або заступник", reason="Причина")
 @is_admin()
 async def reprimand(ctx: commands.Context, nickname: str = None, *, reason: str = None):
     await auto_purge(ctx)
     if not (nickname and reason):
-        await ctx.send(embed=usage_error("догана [нік] [причина]"), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(usage_error("догана [нік] [причина]"))
         return
     await reprimand_impl(ctx, nickname, reason)
 
@@ -508,12 +1247,8 @@ def parse_channel_arg(guild: discord.Guild, arg: str) -> Optional[discord.TextCh
         if isinstance(ch, discord.TextChannel):
             return ch
     # Назва каналу
-    # Пошук за назвою (без #, без регістру)
-    name = arg.strip().lstrip('#').lower()
-    for ch in guild.text_channels:
-        if ch.name.lower() == name:
-            return ch
-    return None
+    # Пошук за назвою (без #, без регістру) через індекс гільдії
+    return GUILDS.get(guild).text_channel_by_name(arg)
 
 
 def make_news_embed(author: discord.Member, channel: discord.TextChannel, text: str) -> discord.Embed:
@@ -533,63 +1268,114 @@ def make_news_embed(author: discord.Member, channel: discord.TextChannel, text:
     return embed
 
 
-@bot.command(name="news", aliases=["новини"]) 
-async def news(ctx: commands.Context, channel_arg: str = None, *, text: str = None):
+def split_news_args(guild: discord.Guild, raw: str) -> Tuple[list, str]:
+    # Перший токен — канал(и) у будь-якій формі (через кому); далі додатковими
+    # каналами вважаються лише згадки <#id> та числові ID, щоб звичайні слова
+    # тексту, що збігаються з назвою каналу, не ставали адресатами
+    channels = []
+    rest = raw.strip()
+    while rest:
+        token, _sep, tail = rest.partition(" ")
+        parts = [p for p in token.split(",") if p]
+        if channels and not all(re.fullmatch(r"<#\d+>|\d+", p) for p in parts):
+            break
+        resolved = [parse_channel_arg(guild, p) for p in parts]
+        if not parts or not all(resolved):
+            break
+        for ch in resolved:
+            if ch not in channels:
+                channels.append(ch)
+        rest = tail.strip()
+    return channels, rest
+
+
+async def send_with_retry(channel: discord.TextChannel, **kwargs) -> discord.Message:
+    # discord.py сам чекає на 429, але глобальні ліміти/5xx можуть пробитися — повторюємо з паузою
+    delay = 1.0
+    for attempt in range(NEWS_SEND_RETRIES):
+        try:
+            return await SCHEDULER.submit(Priority.REPLY, lambda: channel.send(**kwargs))
+        except discord.HTTPException as e:
+            if isinstance(e, discord.Forbidden) or attempt == NEWS_SEND_RETRIES - 1 or (e.status != 429 and e.status < 500):
+                raise
+            # HTTPException не містить retry_after (429 чекає сам discord.py) — експоненційна пауза
+            await asyncio.sleep(delay)
+            delay *= 2
+
+
+async def add_news_reactions(msg: discord.Message):
+    await asyncio.gather(*(SCHEDULER.add_reaction(msg, emoji) for emoji in NEWS_REACTIONS), return_exceptions=True)
+
+
+@bot.hybrid_command(name="news", aliases=["новини"], description="Опублікувати новину в один або кілька каналів") 
+@app_commands.describe(args="Канали (#канал ...), потім текст новини")
+async def news(ctx: commands.Context, *, args: str = None):
     await auto_purge(ctx)
-    if not (channel_arg and text):
-        await ctx.send(embed=usage_error("новини [#канал|назва|ID] [текст]"), delete_after=AUTO_DELETE_SECONDS)
+    usage = "новини [#канал|назва|ID ...] [текст]"
+    if not args:
+        await ctx.fail(usage_error(usage))
         return
 
-    channel = parse_channel_arg(ctx.guild, channel_arg)
-    if not channel:
-        await ctx.send(
-            embed=discord.Embed(
+    channels, text = split_news_args(ctx.guild, args)
+    if not channels:
+        await ctx.fail(
+            discord.Embed(
                 title="❌ Канал не знайдено",
                 description=(
-                    "Вкажіть назву каналу, згадку або ID.\n"
-                    f"Приклад: `{COMMAND_PREFIX}новини #general Текст` або `{COMMAND_PREFIX}новини general Текст`\n{SEP}"
+                    "Вкажіть назву каналу, згадку або ID (можна кілька).\n"
+                    f"Приклад: `{COMMAND_PREFIX}новини #general Текст` або `{COMMAND_PREFIX}новини #general #news Текст`\n{SEP}"
                 ),
                 color=COLOR_ERROR,
             ),
-            delete_after=AUTO_DELETE_SECONDS,
         )
         return
+    if not text:
+        await ctx.fail(usage_error(usage))
+        return
 
-    # Перевірка прав: автор має мати право писати у цільовий канал
-    perms = channel.permissions_for(ctx.author)
-    if not perms.send_messages:
-        await ctx.send(embed=discord.Embed(title="❌ Немає прав", description=f"У вас немає права писати у #{channel.name}.\n{SEP}", color=COLOR_ERROR), delete_after=AUTO_DELETE_SECONDS)
+    # Перевірка прав: автор має мати право писати у кожен цільовий канал
+    denied = [ch for ch in channels if not ch.permissions_for(ctx.author).send_messages]
+    if denied:
+        names = ", ".join(f"#{ch.name}" for ch in denied)
+        await ctx.fail(discord.Embed(title="❌ Немає прав", description=f"У вас немає права писати у {names}.\n{SEP}", color=COLOR_ERROR))
         return
 
-    embed = make_news_embed(ctx.author, channel, text)
-    try:
-        msg = await channel.send(embed=embed)
-    except discord.Forbidden:
-        await ctx.send(embed=discord.Embed(title="❌ Помилка", description=f"Бот не може писати у #{channel.name}. Перевірте права.\n{SEP}", color=COLOR_ERROR), delete_after=AUTO_DELETE_SECONDS)
+    await defer_if_slash(ctx)
+    semaphore = asyncio.Semaphore(NEWS_FANOUT_CONCURRENCY)
+
+    async def publish(channel: discord.TextChannel):
+        async with semaphore:
+            msg = await send_with_retry(channel, embed=make_news_embed(ctx.author, channel, text))
+        await add_news_reactions(msg)
+        return msg
+
+    results = await asyncio.gather(*(publish(ch) for ch in channels), return_exceptions=True)
+    published = [(ch, r) for ch, r in zip(channels, results) if isinstance(r, discord.Message)]
+    failed = [ch for ch, r in zip(channels, results) if not isinstance(r, discord.Message)]
+
+    if failed:
+        names = ", ".join(f"#{ch.name}" for ch in failed)
+        await ctx.fail(discord.Embed(title="❌ Помилка", description=f"Бот не може писати у {names}. Перевірте права.\n{SEP}", color=COLOR_ERROR))
+    if not published:
         return
 
-    # Реакції
-    for emoji in ["✅", "❌", "📌"]:
-        try:
-            await msg.add_reaction(emoji)
-        except Exception:
-            pass
+    # Трекінг новин: один запис на всі копії
+    copies = [{"channel": ch.name, "channel_id": ch.id, "message_id": msg.id} for ch, msg in published]
+    DM.add_news(text, str(ctx.author), copies)
+    names = ", ".join(f"#{ch.name}" for ch, _msg in published)
+    log_event(f"News published by {ctx.author} in {names}: {text[:60]}...", str(ctx.author), "news", None, channel=names, text=text[:200])
 
-    # Трекінг новин
-    DM.add_news(text, str(ctx.author), channel.name, channel.id)
-    DM.log(f"News published by {ctx.author} in #{channel.name}: {text[:60]}...")
+    # План видалення всіх копій через NEWS_TTL_HOURS
+    # (таймери зберігаються у warm-state при перезапуску)
+    for _ch, msg in published:
+        SCHEDULER.delete_message(msg, delay=NEWS_TTL_HOURS * 3600)
 
-    # План видалення через 24 години
-    async def delete_later(m: discord.Message):
-        try:
-            await asyncio.sleep(NEWS_TTL_HOURS * 3600)
-            await m.delete()
-        except Exception:
-            pass
-    bot.loop.create_task(delete_later(msg))
+    # Слеш-команда чекає на відповідь після defer
+    if ctx.interaction is not None:
+        await ctx.send(embed=discord.Embed(title="✅ Опубліковано", description=f"Новину опубліковано у {names}.\n{SEP}", color=COLOR_SUCCESS), delete_after=AUTO_DELETE_SECONDS)
 
 
-@bot.command(name="news_list", aliases=["список_новин"]) 
+@bot.hybrid_command(name="news_list", aliases=["список_новин"], description="Останні 10 новин") 
 async def news_list(ctx: commands.Context):
     data = DM.load()
     entries = data.get("news", [])[:10]
@@ -601,27 +1387,156 @@ async def news_list(ctx: commands.Context):
         text = item.get("text", "")
         author = item.get("author", "-")
         date = item.get("date", "-")
-        channel = item.get("channel", "-")
+        copies = item.get("copies") or [{"channel": item.get("channel", "-")}]
+        channel = ", #".join(str(c.get("channel", "-")) for c in copies)
         value = (text if len(text) <= 200 else text[:197] + "...")
         embed.add_field(name=f"{date} — #{channel}", value=value, inline=False)
     embed.set_footer(text="Використовуйте !новини для публікації")
     await ctx.send(embed=embed)
 
 
+# ===================== АВТОДОПОВНЕННЯ СЛЕШ-КОМАНД =====================
+# Відповідь з пам'яті (індекс реєстру / учасників) — далеко в межах 3 с
+
+def roster_autocomplete(category: Optional[str]):
+    async def complete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        return [app_commands.Choice(name=nick[:100], value=nick) for nick in ROSTER.nicknames(current, category)]
+    return complete
+
+
+async def member_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    guild = interaction.guild
+    if guild is None:
+        return []
+    if guild.chunked:
+        choices = GUILDS.get(guild).member_choices(current)
+    else:
+        # MEMORY_PROFILE=low: кеш учасників неповний, питаємо шлюз (автодоповнення має відповісти за 3 с)
+        try:
+            found = await asyncio.wait_for(guild.query_members(query=current.strip(), limit=25), timeout=2)
+        except (asyncio.TimeoutError, discord.ClientException):
+            return []
+        choices = [(f"{m.display_name} ({m.name})", m.id) for m in found if not m.bot]
+    return [app_commands.Choice(name=label[:100], value=str(member_id)) for label, member_id in choices]
+
+
+async def organization_autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+    return [app_commands.Choice(name=org[:100], value=org) for org in ROSTER.organizations(current)]
+
+
+for _cmd in (add_leader, add_deputy):
+    _cmd.autocomplete("nickname")(member_autocomplete)
+    _cmd.autocomplete("організація")(organization_autocomplete)
+for _cmd, _category in ((remove_leader, "leaders"), (leader, "leaders"), (remove_deputy, "deputies"), (deputy, "deputies"), (warning, None), (reprimand, None)):
+    _cmd.autocomplete("nickname")(roster_autocomplete(_category))
+
+
 # ===================== КОРИСНІ КОМАНДИ =====================
 
+def clear_status_embed(progress, amount: int) -> discord.Embed:
+    title = "✅ Очищено" if progress.done else "🧹 Очищення..."
+    color = COLOR_SUCCESS if progress.done else COLOR_INFO
+    desc = (
+        f"Переглянуто: **{progress.scanned}**\n"
+        f"Видалено: **{progress.deleted}** / {amount} "
+        f"(пакетно: {progress.bulk_deleted}, поштучно: {progress.single_deleted})\n"
+    )
+    if progress.failed:
+        desc += f"Не вдалося видалити: {progress.failed}\n"
+    if progress.stopped == "scan":
+        desc += f"Зупинено: переглянуто максимум ({CLEAR_MAX_SCAN}) повідомлень.\n"
+    elif progress.stopped == "age":
+        desc += "Зупинено: далі повідомлення старші 14 днів (`old` — видаляти і їх, поштучно).\n"
+    return discord.Embed(title=title, description=f"{desc}{SEP}", color=color)
+
+
+CLEAR_FILTER_RE = re.compile(r'(\w+):"([^"]*)"|"([^"]*)"|(\S+)')
+
+
+def split_filter_args(raw: str) -> List[str]:
+    # Фільтри через пробіл; значення з пробілами беруться в лапки: contains:"два слова"
+    items = []
+    for m in CLEAR_FILTER_RE.finditer(raw):
+        if m.group(1) is not None:
+            items.append(f"{m.group(1)}:{m.group(2)}")
+        else:
+            items.append(m.group(3) if m.group(3) is not None else m.group(4))
+    return items
+
+
 @bot.command(name="clear", aliases=["очистити"]) 
 @is_admin()
-async def clear(ctx: commands.Context, amount: int = None):
+async def clear(ctx: commands.Context, amount: int = None, *, filters: str = ""):
     await auto_purge(ctx)
-    if amount is None or amount < 1 or amount > 100:
-        await ctx.send(embed=usage_error("очистити [кількість<=100]"), delete_after=AUTO_DELETE_SECONDS)
+    usage = f"очистити [кількість<={CLEAR_MAX_AMOUNT}] [user:нік] [contains:\"текст\"] [regex:\"шаблон\"] [bots] [old] [before:ID|дата] [after:ID|дата]"
+    if amount is None or amount < 1 or amount > CLEAR_MAX_AMOUNT:
+        await ctx.fail(usage_error(usage))
         return
+
+    flt = PurgeFilter()
+    bounds = {"before": None, "after": None}
+    include_old = False
+    for item in split_filter_args(filters):
+        key, sep, value = item.partition(":")
+        key = key.lower()
+        if key == "bots" and not sep:
+            flt.bots_only = True
+        elif key == "old" and not sep:
+            include_old = True
+        elif key == "user" and value:
+            if value.strip("<@!>").isdigit():
+                flt.user_ids.add(int(value.strip("<@!>")))
+            else:
+                member = await resolve_member_or_reply(ctx, value)
+                if not member:
+                    return
+                flt.user_ids.add(member.id)
+        elif key == "contains" and value:
+            flt.contains = value
+        elif key == "regex" and value:
+            flt.pattern = compile_pattern(value)
+            if flt.pattern is None:
+                await ctx.fail(discord.Embed(title="❌ Помилка", description=f"Некоректний регулярний вираз.\n{SEP}", color=COLOR_ERROR))
+                return
+        elif key in bounds and value:
+            if value.isdigit():
+                bounds[key] = discord.Object(id=int(value))
+            else:
+                ts = parse_date_arg(value)
+                if ts is None:
+                    await ctx.fail(usage_error(usage))
+                    return
+                bounds[key] = datetime.fromtimestamp(ts).astimezone()
+        else:
+            await ctx.fail(usage_error(usage))
+            return
+
+    status = await ctx.send(embed=discord.Embed(title="🧹 Очищення...", description=f"Починаю перегляд історії (до {CLEAR_MAX_SCAN} повідомлень).\n{SEP}", color=COLOR_INFO))
+
+    async def on_progress(progress):
+        await status.edit(embed=clear_status_embed(progress, amount))
+
     try:
-        deleted = await ctx.channel.purge(limit=amount)
-        await ctx.send(embed=discord.Embed(title="✅ Очищено", description=f"Видалено {len(deleted)} повідомлень.\n{SEP}", color=COLOR_SUCCESS), delete_after=AUTO_DELETE_SECONDS)
+        progress = await filtered_purge(
+            ctx.channel,
+            amount,
+            flt,
+            before=bounds["before"],
+            after=bounds["after"],
+            skip_ids=(ctx.message.id, status.id),
+            on_progress=on_progress,
+            max_scan=CLEAR_MAX_SCAN,
+            # Фільтр може не збігатися ні з чим: без `old`/`before:` не йдемо за межу 14 днів
+            stop_at_horizon=flt.active and not include_old and bounds["before"] is None,
+        )
     except discord.Forbidden:
-        await ctx.send(embed=discord.Embed(title="❌ Помилк�� доступу", description=f"Мені потрібен дозвіл 'Керувати повідомленнями'.\n{SEP}", color=COLOR_ERROR), delete_after=AUTO_DELETE_SECONDS)
+        await status.edit(embed=discord.Embed(title="❌ Помилка доступу", description=f"Мені потрібен дозвіл 'Керувати повідомленнями'.\n{SEP}", color=COLOR_ERROR), delete_after=AUTO_DELETE_SECONDS)
+        return
+    await status.edit(embed=clear_status_embed(progress, amount), delete_after=AUTO_DELETE_SECONDS)
+    log_event(
+        f"{ctx.author} очистив(ла) {progress.deleted} повідомлень у #{ctx.channel.name}",
+        str(ctx.author), "clear", None, channel=ctx.channel.name, count=progress.deleted,
+    )
 
 
 @bot.command(name="check_member", aliases=["перевірити_учасника"]) 
@@ -629,7 +1544,7 @@ async def clear(ctx: commands.Context, amount: int = None):
 async def check_member(ctx: commands.Context, *, nickname: str = None):
     await auto_purge(ctx)
     if not nickname:
-        await ctx.send(embed=usage_error("перевірити_учасника [нік]"), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(usage_error("перевірити_учасника [нік]"))
         return
     member = await resolve_member_or_reply(ctx, nickname)
     if not member:
@@ -641,6 +1556,279 @@ async def check_member(ctx: commands.Context, *, nickname: str = None):
     await ctx.send(embed=embed, delete_after=AUTO_DELETE_SECONDS)
 
 
+AUDIT_ACTION_LABELS = {
+    "add_person": "➕ Призначення",
+    "remove_person": "➖ Видалення",
+    "warning": "⚠️ Попередження",
+    "reprimand": "🟧 Догана",
+    "dismissal": "🟥 Звільнення",
+    "news": "🟣 Новина",
+    "news_cleanup": "🧹 Очищення новин",
+    "clear": "🧹 Очищення каналу",
+    "config_reload": "⚙️ Конфігурація",
+    "restore": "🗄️ Відновлення",
+    "error": "❌ Помилка",
+}
+
+
+def describe_audit_event(event) -> str:
+    details = event.details
+    parts = []
+    if event.target:
+        parts.append(f"ціль: **{event.target}**")
+    for key in ("org", "position", "channel", "count", "reason", "snapshot", "error", "text"):
+        if details.get(key) not in (None, ""):
+            value = str(details[key])
+            parts.append(f"{key}: {value if len(value) <= 80 else value[:77] + '...'}")
+    return " | ".join(parts) or "-"
+
+
+def audit_target_aliases(target: Optional[str]) -> Optional[List[str]]:
+    # Ціль шукаємо і за ніком, і за ID учасника: згадка/ID або нік із реєстру
+    if not target:
+        return None
+    aliases = [target]
+    m = re.fullmatch(r"<@!?(\d+)>", target)
+    if m:
+        aliases.append(m.group(1))
+    else:
+        _, info = detect_category(target)
+        if info and info.get("member_id"):
+            aliases.append(str(info["member_id"]))
+    return aliases
+
+
+@bot.command(name="audit", aliases=["аудит"]) 
+@is_admin()
+async def audit(ctx: commands.Context, *filters: str):
+    await auto_purge(ctx)
+    usage = "аудит [actor:нік] [target:нік|@згадка] [from:дд.мм.рррр] [to:дд.мм.рррр] [page:N]"
+    query = {}
+    for item in filters:
+        key, sep, value = item.partition(":")
+        if not sep or not value or key.lower() not in ("actor", "target", "from", "to", "page"):
+            await ctx.fail(usage_error(usage))
+            return
+        query[key.lower()] = value
+    since = parse_date_arg(query["from"]) if "from" in query else None
+    until = parse_date_arg(query["to"], end_of_day=True) if "to" in query else None
+    if ("from" in query and since is None) or ("to" in query and until is None) or not query.get("page", "1").isdigit():
+        await ctx.fail(usage_error(usage))
+        return
+
+    filters = {"actor": query.get("actor"), "target": audit_target_aliases(query.get("target")), "since": since, "until": until}
+    events = AUDIT.query(**filters)
+    if AUDIT.archived_before is not None and (since is None or since < AUDIT.archived_before):
+        # Старіші події є лише у файлі — читаємо його поза циклом подій
+        events += await asyncio.get_running_loop().run_in_executor(None, lambda: AUDIT.query_archive(**filters))
+    if not events:
+        await ctx.send(embed=discord.Embed(title="ℹ️ Аудит", description=f"Подій не знайдено.\n{SEP}", color=COLOR_INFO), delete_after=AUTO_DELETE_SECONDS)
+        return
+    items, pages = paginate(events, int(query.get("page", "1")), AUDIT_PAGE_SIZE)
+    page = min(max(1, int(query.get("page", "1"))), pages)
+    embed = discord.Embed(title="📜 Журнал аудиту", description=f"Знайдено подій: **{len(events)}**\n{SEP}", color=COLOR_INFO)
+    for event in items:
+        label = AUDIT_ACTION_LABELS.get(event.action, event.action)
+        embed.add_field(
+            name=f"{event.date_str()} — {label} — {event.actor or 'система'}",
+            value=describe_audit_event(event),
+            inline=False,
+        )
+    embed.set_footer(text=f"Сторінка {page}/{pages} | Наступна: {COMMAND_PREFIX}аудит ... page:{min(page + 1, pages)}")
+    await ctx.send(embed=embed)
+
+
+@bot.command(name="inactive", aliases=["неактивні"]) 
+@is_admin()
+async def inactive(ctx: commands.Context, days: int = INACTIVE_AFTER_DAYS):
+    await auto_purge(ctx)
+    if days < 1:
+        await ctx.fail(usage_error("неактивні [днів]"))
+        return
+    # Спершу скидаємо накопичені лічильники, щоб звіт був актуальним
+    flush_activity()
+    people = DM.inactive_people(days)
+    if not people:
+        await ctx.send(embed=discord.Embed(title="✅ Неактивні", description=f"Усі керівники та заступники активні за останні {days} дн.\n{SEP}", color=COLOR_SUCCESS), delete_after=AUTO_DELETE_SECONDS)
+        return
+    embed = discord.Embed(title=f"💤 Неактивні понад {days} дн.", description=f"Знайдено: **{len(people)}**\n{SEP}", color=COLOR_WARNING)
+    now = datetime.now()
+    for person in people[:25]:
+        info = person["info"]
+        role = "👑" if person["category"] == "leaders" else "🛡️"
+        ago = f"{(now - person['last']).days} дн. тому" if person["last"] else "ніколи"
+        stats = info.get("activity_stats", {})
+        embed.add_field(
+            name=f"{role} {person['nickname']} — {get_org_from_info(info)}",
+            value=f"Остання активність: {info.get('last_activity', '-')} ({ago})\nПовідомлень: {stats.get('messages', 0)} | Голос: {stats.get('voice_minutes', 0)} хв",
+            inline=False,
+        )
+    await ctx.send(embed=embed)
+
+
+@bot.command(name="reload_config", aliases=["перезавантажити_конфіг"]) 
+@is_admin()
+async def reload_config(ctx: commands.Context):
+    await auto_purge(ctx)
+    try:
+        cfg = CONFIG_WATCHER.load()
+    except ConfigError as e:
+        await ctx.fail(discord.Embed(title="❌ Помилка конфігурації", description=f"`{e}`\nПопередні налаштування залишено.\n{SEP}", color=COLOR_ERROR))
+        return
+    apply_config(cfg)
+    log_event(f"{ctx.author} перезавантажив(ла) конфігурацію", str(ctx.author), "config_reload")
+    await ctx.send(embed=discord.Embed(title="✅ Конфігурацію оновлено", description=f"Налаштування з config.json застосовано, кеш ролей скинуто.\n{SEP}", color=COLOR_SUCCESS), delete_after=AUTO_DELETE_SECONDS)
+
+
+@bot.command(name="restore", aliases=["відновити"]) 
+@is_admin()
+async def restore(ctx: commands.Context, timestamp: str = None):
+    await auto_purge(ctx)
+    if not timestamp:
+        snapshots = (await run_in_snapshot_thread(SNAPSHOTS.list))[-15:]
+        if not snapshots:
+            await ctx.send(embed=discord.Embed(title="ℹ️ Знімки", description=f"Знімків ще немає.\n{SEP}", color=COLOR_INFO), delete_after=AUTO_DELETE_SECONDS)
+            return
+        lines = [
+            f"`{stamp.strftime(STAMP_FMT)}` — {stamp.strftime(DATE_FMT)}" + (" ↩️ до відновлення" if SNAPSHOTS.is_pre_restore(path) else "")
+            for stamp, path in reversed(snapshots)
+        ]
+        embed = discord.Embed(title="🗄️ Доступні знімки", description="\n".join(lines) + f"\n{SEP}", color=COLOR_INFO)
+        embed.set_footer(text=f"Відновлення: {COMMAND_PREFIX}відновити [мітка або її початок]")
+        await ctx.send(embed=embed, delete_after=AUTO_DELETE_SECONDS * 4)
+        return
+
+    found = await run_in_snapshot_thread(SNAPSHOTS.find, timestamp)
+    if not found:
+        await ctx.fail(discord.Embed(title="⚠️ Не знайдено", description=f"Знімка `{timestamp}` немає. Список: `{COMMAND_PREFIX}відновити`\n{SEP}", color=COLOR_WARNING))
+        return
+    data = await run_in_snapshot_thread(SNAPSHOTS.load, found[1])
+    # Поточний стан зберігаємо окремим знімком, щоб відновлення можна було скасувати
+    await take_snapshot(pre_restore=True)
+    DM.save(data)
+    EXPIRY.load(Expiry(**p) for p in DM.backfill_expiries(punishment_ttl_seconds()))
+    stamp = found[0].strftime(STAMP_FMT)
+    log_event(f"{ctx.author} відновив(ла) дані зі знімка {stamp}", str(ctx.author), "restore", None, snapshot=stamp)
+    await ctx.send(embed=discord.Embed(title="✅ Відновлено", description=f"Дані відновлено зі знімка `{stamp}`.\n{SEP}", color=COLOR_SUCCESS), delete_after=AUTO_DELETE_SECONDS)
+
+
+def job_line(job) -> str:
+    progress = f" {job.done}/{job.total}" if job.total else ""
+    return f"`#{job.id}` {job.name} — {job.status}{progress}"
+
+
+@bot.command(name="export", aliases=["експорт"]) 
+@is_admin()
+async def export(ctx: commands.Context):
+    await auto_purge(ctx)
+    status = await ctx.send(embed=discord.Embed(title="📦 Експорт", description=f"Задачу поставлено в чергу.\n{SEP}", color=COLOR_INFO))
+
+    async def on_progress(job):
+        await status.edit(embed=discord.Embed(title="📦 Експорт", description=f"{job_line(job)}\n{SEP}", color=COLOR_INFO))
+
+    job = POOL.submit("export", roster_csv, DM.load(), on_progress=on_progress)
+    try:
+        payload = await job.future
+    except JobCancelled:
+        await status.edit(embed=discord.Embed(title="⚠️ Скасовано", description=f"Експорт `#{job.id}` скасовано.\n{SEP}", color=COLOR_WARNING), delete_after=AUTO_DELETE_SECONDS)
+        return
+    except Exception as e:
+        DM.log(f"Export failed: {type(e).__name__}: {e}")
+        await status.edit(embed=discord.Embed(title="❌ Помилка", description=f"Експорт не вдався. Перевірте логи.\n{SEP}", color=COLOR_ERROR), delete_after=AUTO_DELETE_SECONDS)
+        return
+    await status.delete()
+    filename = f"horizont_roster_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
+    await ctx.send(
+        embed=discord.Embed(title="📦 Експорт", description=f"Керівники та заступники.\n{SEP}", color=COLOR_SUCCESS),
+        file=discord.File(io.BytesIO(payload), filename=filename),
+    )
+
+
+@bot.command(name="jobs", aliases=["задачі"]) 
+@is_admin()
+async def jobs(ctx: commands.Context, action: str = None, job_id: int = None):
+    await auto_purge(ctx)
+    if action in ("cancel", "скасувати"):
+        if job_id is None:
+            await ctx.fail(usage_error("задачі скасувати [ID]"))
+            return
+        ok = POOL.cancel(job_id)
+        title, color = ("✅ Скасовано", COLOR_SUCCESS) if ok else ("⚠️ Не знайдено", COLOR_WARNING)
+        desc = f"Задачу `#{job_id}` буде зупинено." if ok else f"Активної задачі `#{job_id}` немає."
+        await ctx.send(embed=discord.Embed(title=title, description=f"{desc}\n{SEP}", color=color), delete_after=AUTO_DELETE_SECONDS)
+        return
+    recent = list(POOL.jobs.values())[-10:]
+    desc = "\n".join(job_line(j) for j in reversed(recent)) or "Задач ще не було."
+    await ctx.send(embed=discord.Embed(title="⚙️ Фонові задачі", description=f"{desc}\n{SEP}", color=COLOR_INFO), delete_after=AUTO_DELETE_SECONDS * 4)
+
+
+@bot.command(name="mem", aliases=["пам'ять", "памʼять"]) 
+@is_admin()
+async def mem(ctx: commands.Context, action: str = None):
+    await auto_purge(ctx)
+    if action in ("on", "off"):
+        # Трасування додає накладні витрати — вмикається лише на час діагностики
+        if action == "on" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif action == "off" and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        state = "увімкнено" if tracemalloc.is_tracing() else "вимкнено"
+        await ctx.send(embed=discord.Embed(title="🧠 tracemalloc", description=f"Трасування {state}.\n{SEP}", color=COLOR_INFO), delete_after=AUTO_DELETE_SECONDS)
+        return
+
+    embed = discord.Embed(title="🧠 Пам'ять", color=COLOR_INFO)
+    embed.description = (
+        f"RSS: **{format_bytes(rss_bytes())}**\n"
+        f"Профіль: `{MEMORY_PROFILE}` (max_messages={_memory['max_messages']}, member_cache={_memory['member_cache']}, "
+        f"audit_events={_memory['audit_events']})\n{SEP}"
+    )
+    data = DM.load()
+    members = sum(len(g.members) for g in bot.guilds)
+    chunked = sum(1 for g in bot.guilds if g.chunked)
+    embed.add_field(name="👥 Учасники в кеші", value=f"{members} ({chunked}/{len(bot.guilds)} гільдій повністю)")
+    embed.add_field(name="💬 Кеш повідомлень", value=str(len(bot.cached_messages)))
+    embed.add_field(name="📋 Реєстр", value=(
+        f"{len(data.get('leaders', {}))} кер. / {len(data.get('deputies', {}))} заст.\n"
+        f"Файл: {format_bytes(os.path.getsize(DATA_PATH))}"
+    ))
+    embed.add_field(name="🟣 Новини", value=str(len(data.get("news", []))))
+    embed.add_field(name="📜 Аудит у пам'яті", value=f"{len(AUDIT.events)} подій")
+    embed.add_field(name="🔎 Індекс реєстру", value=f"{ROSTER.size()} записів")
+    embed.add_field(name="🗂️ Інші кеші", value=(
+        f"Контексти гільдій: {len(GUILDS)}\n"
+        f"Активність (очікує запису): {ACTIVITY.pending_count()}\n"
+        f"Терміни покарань: {len(EXPIRY)}\n"
+        f"Фонові задачі: {len(POOL.jobs)}"
+    ))
+    # Знімок великої купи будується довго — не в циклі подій
+    top, traced = await asyncio.get_running_loop().run_in_executor(None, tracemalloc_top, 8)
+    if top:
+        lines = [f"`{loc}` — {format_bytes(size)} ({count})" for loc, size, count in top]
+        embed.add_field(name=f"🔬 Топ алокацій (усього {format_bytes(traced)})", value="\n".join(lines), inline=False)
+    else:
+        embed.add_field(name="🔬 tracemalloc", value=f"Вимкнено. `{COMMAND_PREFIX}пам'ять on` або TRACEMALLOC=1 у .env", inline=False)
+    await ctx.send(embed=embed, delete_after=AUTO_DELETE_SECONDS * 6)
+
+
+@bot.command(name="queue", aliases=["черга"]) 
+@is_admin()
+async def queue_stats(ctx: commands.Context):
+    await auto_purge(ctx)
+    labels = {Priority.MODERATION: "🛡️ Модерація", Priority.REPLY: "💬 Відповіді", Priority.COSMETIC: "🧹 Косметика"}
+    embed = discord.Embed(title="📬 Черга запитів до Discord", color=COLOR_INFO)
+    for priority, m in SCHEDULER.metrics().items():
+        embed.add_field(
+            name=labels[priority],
+            value=(
+                f"У черзі: **{m['depth']}** (відкладених: {m['delayed']})\n"
+                f"Виконано: {m['completed']} (помилок: {m['failed']})\n"
+                f"Об'єднано: {m['coalesced']}\n"
+                f"Очікування: сер. {m['avg_wait'] * 1000:.0f} мс, макс. {m['max_wait'] * 1000:.0f} мс"
+            ),
+        )
+    await ctx.send(embed=embed, delete_after=AUTO_DELETE_SECONDS * 4)
+
+
 @bot.command(name="stats", aliases=["статистика"]) 
 async def stats(ctx: commands.Context):
     data = DM.load()
@@ -648,7 +1836,7 @@ async def stats(ctx: commands.Context):
     deputies = data.get("deputies", {})
     rep_count = sum(len(v.get("reprimands", [])) for v in list(leaders.values()) + list(deputies.values()))
     warn_count = sum(len(v.get("warnings", [])) for v in list(leaders.values()) + list(deputies.values()))
-    total_commands = data.get("settings", {}).get("total_commands", 0)
+    total_commands = data.get("settings", {}).get("total_commands", 0) + PENDING_COMMANDS
     embed = discord.Embed(title="📊 Статистика сервера", color=COLOR_INFO)
     embed.add_field(name="👑 Керівники", value=str(len(leaders)))
     embed.add_field(name="🛡️ Заступники", value=str(len(deputies)))
@@ -683,16 +1871,26 @@ async def help_cmd(ctx: commands.Context):
         "`!попередження [нік] [причина]` — запис у базі (без ролей)",
         f"Після {WARNINGS_PER_REPRIMAND} попереджень — автоматична `!догана`",
         "`!догана [нік] [причина]` — прогресія ролей (1→🟡, 2→🟠, 3→звільнення)",
+        f"Термін дії: попередження — {WARNING_EXPIRY_DAYS} дн., догана — {REPRIMAND_EXPIRY_DAYS} дн. (0 — безстроково)",
     ]), inline=False)
     embed.add_field(name="🟣 Новини", value="\n".join([
-        "`!новини [#канал|назва|ID] [текст]` — публікація новини",
+        "`!новини [#канал ...] [текст]` — публікація новини (можна у кілька каналів: згадки/ID або `назва1,назва2`)",
         "`!список_новин` — останні 10 новин",
     ]), inline=False)
+    embed.add_field(name="⌨️ Слеш-команди", value="Керівництво, покарання та новини доступні також через `/` (напр. `/add_leader`, `/warning`, `/news`) з автодоповненням ніків", inline=False)
     embed.add_field(name="🛠️ Утиліти", value="\n".join([
-        "`!очистити [кількість]` — видалити повідомлення (≤100)",
+        f"`!очистити [кількість] [user:] [contains:] [regex:] [bots] [before:] [after:]` — видалити повідомлення (≤{CLEAR_MAX_AMOUNT})",
         "`!перевірити_ролі` — перевірка наявності ролей",
         "`!перевірити_учасника [нік]` — докладна інформація",
         "`!статистика`, `!інфо`",
+        "`!черга` — стан черги запитів до Discord",
+        "`!перезавантажити_конфіг` — застосувати config.json без рестарту",
+        "`!відновити [мітка]` — список знімків / відновлення даних",
+        "`!експорт` — CSV зі списком керівників/заступників",
+        "`!задачі [скасувати ID]` — фонові задачі",
+        "`!пам'ять [on|off]` — використання пам'яті та кешів",
+        f"`!неактивні [днів]` — керівники/заступники без активності (за замовч. {INACTIVE_AFTER_DAYS})",
+        "`!аудит [actor:] [target:] [from:] [to:] [page:]` — журнал дій адміністрації",
     ]), inline=False)
     embed.set_footer(text="Усі команди мають англійські аналоги для сумісності.")
     await ctx.send(embed=embed)
@@ -702,21 +1900,45 @@ async def help_cmd(ctx: commands.Context):
 
 @bot.event
 async def on_command_error(ctx: commands.Context, error: commands.CommandError):
-    try:
-        DM.increment_commands()
-    except Exception:
-        pass
+    # Для слеш-версій гібридних команд after_invoke не викликається при помилці
+    INFLIGHT.discard(ctx)
+    # Виклики, відхилені захистом, не рахуються як виконані команди
+    if isinstance(error, Coalesced):
+        # Префіксна команда: відповідь уже в каналі — нічого не надсилаємо
+        if ctx.interaction is not None:
+            shared = error.shared.result() if error.shared.done() else None
+            where = f"Відповідь: {shared.jump_url}" if isinstance(shared, discord.Message) else "Відповідь з'явиться в цьому каналі."
+            await ctx.fail(discord.Embed(title="🔁 Така ж команда щойно виконана", description=f"{where}\n{SEP}", color=COLOR_INFO))
+        return
+    if isinstance(error, RateLimited):
+        await auto_purge(ctx)
+        if error.notify or ctx.interaction is not None:
+            await ctx.fail(discord.Embed(title="⏳ Забагато запитів", description=f"Спробуйте ще раз через {error.retry_after:.0f} с.\n{SEP}", color=COLOR_WARNING))
+        return
+    if isinstance(error, DuplicateCommand):
+        await auto_purge(ctx)
+        await ctx.fail(discord.Embed(title="⚠️ Повторна команда", description=f"`{ctx.clean_prefix}{ctx.command.qualified_name}` для `{error.target}` щойно виконано — повтор проігноровано.\n{SEP}", color=COLOR_WARNING))
+        return
+    if isinstance(error, ShuttingDown):
+        await ctx.fail(discord.Embed(title="🔄 Перезапуск", description=f"Бот перезапускається, повторіть команду за хвилину.\n{SEP}", color=COLOR_WARNING))
+        return
+    count_command()
+    # Команда не виконалась — її повтор не є дублем, спільну відповідь скасовано
+    ctx.mark_failed()
     if isinstance(error, commands.MissingPermissions):
-        await ctx.send(embed=discord.Embed(title="❌ Немає прав", description=f"У вас недостатньо прав.\n{SEP}", color=COLOR_ERROR), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(discord.Embed(title="❌ Немає прав", description=f"У вас недостатньо прав.\n{SEP}", color=COLOR_ERROR))
+        return
+    if isinstance(error, commands.CheckFailure):
+        # Перевірка (напр. is_admin) уже відповіла користувачу
         return
     if isinstance(error, commands.MissingRequiredArgument):
-        await ctx.send(embed=discord.Embed(title="⚠️ Відсутні аргументи", description=f"{error}\n{SEP}", color=COLOR_WARNING), delete_after=AUTO_DELETE_SECONDS)
+        await ctx.fail(discord.Embed(title="⚠️ Відсутні аргументи", description=f"{error}\n{SEP}", color=COLOR_WARNING))
         return
     if isinstance(error, commands.CommandNotFound):
         # Ігноруємо невідомі команди
         return
-    DM.log(f"Error: {type(error).__name__}: {error}")
-    await ctx.send(embed=discord.Embed(title="❌ Помилка", description=f"Сталася помилка. Перевірте логи.\n{SEP}", color=COLOR_ERROR), delete_after=AUTO_DELETE_SECONDS)
+    log_event(f"Error: {type(error).__name__}: {error}", None, "error", None, error=f"{type(error).__name__}: {error}")
+    await ctx.fail(discord.Embed(title="❌ Помилка", description=f"Сталася помилка. Перевірте логи.\n{SEP}", color=COLOR_ERROR))
 
 
 # ===================== ВХІДНА ТОЧКА =====================
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Optional
 import discord
 
@@ -11,11 +12,22 @@ async def find_member(guild: discord.Guild, nickname: str) -> Optional[discord.M
             m = guild.get_member(int(inner))
             if m:
                 return m
+            if not guild.chunked:
+                try:
+                    return await guild.fetch_member(int(inner))
+                except discord.HTTPException:
+                    pass
     # If numeric ID
     if nickname.isdigit():
         m = guild.get_member(int(nickname))
         if m:
             return m
+        # Low-memory mode: the member may just not be cached
+        if not guild.chunked:
+            try:
+                return await guild.fetch_member(int(nickname))
+            except discord.HTTPException:
+                pass
     # Exact name or display name or with underscore
     for m in guild.members:
         names = {m.name.lower(), m.display_name.lower()}
@@ -30,4 +42,13 @@ async def find_member(guild: discord.Guild, nickname: str) -> Optional[discord.M
     candidates = [m for m in guild.members if lowered in m.display_name.lower() or lowered in m.name.lower()]
     if len(candidates) == 1:
         return candidates[0]
+    # Without a full member cache, ask the gateway by name prefix
+    if not guild.chunked and not candidates:
+        try:
+            found = await guild.query_members(query=nickname, limit=5)
+        except (asyncio.TimeoutError, discord.ClientException):
+            found = []
+        exact = [m for m in found if lowered in (m.name.lower(), m.display_name.lower())]
+        if len(exact) == 1 or len(found) == 1:
+            return (exact or found)[0]
     return None
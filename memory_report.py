@@ -0,0 +1,47 @@
+import os
+import sys
+import tracemalloc
+from typing import List, Optional, Tuple
+
+
+def rss_bytes() -> Optional[int]:
+    # Current RSS from /proc on Linux; peak RSS from getrusage elsewhere
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_bytes(value: Optional[float]) -> str:
+    if value is None:
+        return "н/д"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+def tracemalloc_top(limit: int = 10) -> Tuple[List[Tuple[str, int, int]], int]:
+    # (location, size, count) of the biggest allocation sites and the total
+    # traced size; empty when tracing is off.
+    if not tracemalloc.is_tracing():
+        return [], 0
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    stats = snapshot.statistics("lineno")
+    top = []
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        top.append((f"{os.path.basename(frame.filename)}:{frame.lineno}", stat.size, stat.count))
+    return top, sum(stat.size for stat in stats)
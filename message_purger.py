@@ -0,0 +1,148 @@
+import asyncio
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Iterable, List, Optional, Pattern, Set, Union
+
+import discord
+
+# Discord rejects bulk deletes of messages older than 14 days
+BULK_DELETE_MAX_AGE = timedelta(days=14)
+BULK_CHUNK_SIZE = 100
+
+
+@dataclass
+class PurgeFilter:
+    user_ids: Set[int] = field(default_factory=set)
+    contains: Optional[str] = None
+    pattern: Optional[Pattern[str]] = None
+    bots_only: bool = False
+
+    @property
+    def active(self) -> bool:
+        return bool(self.user_ids or self.contains or self.pattern or self.bots_only)
+
+    def matches(self, message: discord.Message) -> bool:
+        if self.user_ids and message.author.id not in self.user_ids:
+            return False
+        if self.bots_only and not message.author.bot:
+            return False
+        if self.contains and self.contains.lower() not in message.content.lower():
+            return False
+        if self.pattern and not self.pattern.search(message.content):
+            return False
+        return True
+
+
+@dataclass
+class PurgeProgress:
+    scanned: int = 0
+    deleted: int = 0
+    bulk_deleted: int = 0
+    single_deleted: int = 0
+    failed: int = 0
+    done: bool = False
+    # Why the scan ended early: "scan" (max_scan reached) or "age" (bulk
+    # delete horizon reached with stop_at_horizon)
+    stopped: Optional[str] = None
+
+
+ProgressCallback = Callable[[PurgeProgress], Awaitable[None]]
+HistoryBound = Union[discord.abc.Snowflake, datetime, None]
+
+
+async def filtered_purge(
+    channel: discord.TextChannel,
+    amount: int,
+    flt: PurgeFilter,
+    before: HistoryBound = None,
+    after: HistoryBound = None,
+    skip_ids: Iterable[int] = (),
+    on_progress: Optional[ProgressCallback] = None,
+    progress_interval: float = 3.0,
+    single_delay: float = 1.0,
+    max_scan: Optional[int] = None,
+    stop_at_horizon: bool = False,
+) -> PurgeProgress:
+    # Streams history newest-first: recent matches go out in 100-message bulk
+    # chunks, anything past the 14-day limit is deleted one by one (or ends
+    # the scan with stop_at_horizon). At most max_scan messages are read, so
+    # a filter that matches nothing cannot walk the whole channel.
+    progress = PurgeProgress()
+    skip = set(skip_ids)
+    cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE + timedelta(minutes=1)
+    chunk: List[discord.Message] = []
+    last_report = time.monotonic()
+
+    async def report(force: bool = False):
+        nonlocal last_report
+        if on_progress and (force or time.monotonic() - last_report >= progress_interval):
+            last_report = time.monotonic()
+            try:
+                await on_progress(progress)
+            except Exception:
+                pass
+
+    async def flush():
+        if not chunk:
+            return
+        try:
+            await channel.delete_messages(chunk)
+            progress.bulk_deleted += len(chunk)
+            progress.deleted += len(chunk)
+        except discord.Forbidden:
+            raise
+        except discord.HTTPException:
+            # Some messages were already gone or the bulk call was rejected;
+            # retry the chunk individually
+            for message in chunk:
+                await delete_single(message)
+        chunk.clear()
+        await report()
+
+    async def delete_single(message: discord.Message):
+        try:
+            await message.delete()
+            progress.single_deleted += 1
+            progress.deleted += 1
+        except discord.NotFound:
+            pass
+        except discord.HTTPException:
+            progress.failed += 1
+        await asyncio.sleep(single_delay)
+
+    queued = 0
+    async for message in channel.history(limit=max_scan, before=before, after=after, oldest_first=False):
+        if stop_at_horizon and message.created_at <= cutoff:
+            progress.stopped = "age"
+            break
+        progress.scanned += 1
+        if message.id in skip or not flt.matches(message):
+            if progress.scanned % 500 == 0:
+                await report()
+            continue
+        queued += 1
+        if message.created_at > cutoff:
+            chunk.append(message)
+            if len(chunk) >= BULK_CHUNK_SIZE:
+                await flush()
+        else:
+            await flush()
+            await delete_single(message)
+            await report()
+        if queued >= amount:
+            break
+    if progress.stopped is None and queued < amount and max_scan is not None and progress.scanned >= max_scan:
+        progress.stopped = "scan"
+    await flush()
+    progress.done = True
+    await report(force=True)
+    return progress
+
+
+def compile_pattern(raw: str) -> Optional[Pattern[str]]:
+    try:
+        return re.compile(raw, re.IGNORECASE)
+    except re.error:
+        return None
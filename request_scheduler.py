@@ -0,0 +1,288 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Set, Tuple
+
+import discord
+
+from .message_purger import BULK_CHUNK_SIZE, BULK_DELETE_MAX_AGE
+
+
+class Priority(IntEnum):
+    MODERATION = 0
+    REPLY = 1
+    COSMETIC = 2
+
+
+@dataclass
+class _Job:
+    priority: Priority
+    run: Callable[[], Awaitable[Any]]
+    key: Optional[Hashable] = None
+    future: Optional[asyncio.Future] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _RoleEdit:
+    member: discord.Member
+    add: Dict[int, discord.abc.Snowflake] = field(default_factory=dict)
+    remove: Dict[int, discord.abc.Snowflake] = field(default_factory=dict)
+    reasons: List[str] = field(default_factory=list)
+
+
+@dataclass
+class PriorityStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    coalesced: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def avg_wait(self) -> float:
+        return self.total_wait / self.completed if self.completed else 0.0
+
+
+class RequestScheduler:
+    # Central queue for outbound Discord calls. Cosmetic work (deletes,
+    # reactions) never occupies the reserved worker, so moderation actions
+    # and replies always have a free slot.
+    def __init__(self, workers: int = 4, reserved_workers: int = 1):
+        self.workers = max(1, workers)
+        self.reserved_workers = min(max(0, reserved_workers), self.workers - 1)
+        self._queues: Dict[Priority, Deque[_Job]] = {p: deque() for p in Priority}
+        self._pending: Dict[Hashable, Any] = {}
+        # Members whose role job is running; edits arriving meanwhile wait
+        # in _pending and run as a follow-up job afterwards
+        self._roles_running: Set[Hashable] = set()
+        # (channel_id, message_id) -> (due epoch seconds, priority, timer)
+        self._delayed: Dict[Tuple[int, int], Tuple[float, Priority, asyncio.TimerHandle]] = {}
+        self._running = 0
+        self._stats: Dict[Priority, PriorityStats] = {p: PriorityStats() for p in Priority}
+        self._cond: Optional[asyncio.Condition] = None
+        self._tasks: List[asyncio.Task] = []
+
+    # Lifecycle
+    def _ensure_started(self) -> None:
+        if self._tasks and not all(t.done() for t in self._tasks):
+            return
+        self._cond = asyncio.Condition()
+        self._tasks = [
+            asyncio.get_running_loop().create_task(self._worker(reserved=i < self.reserved_workers))
+            for i in range(self.workers)
+        ]
+
+    async def drain(self, timeout: float) -> bool:
+        # Waits until every queued job has run; delayed deletes are not
+        # waited for (see delayed_deletes()).
+        deadline = time.monotonic() + timeout
+        while self._running or any(self._queues.values()):
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _pop(self, reserved: bool) -> Optional[_Job]:
+        for priority in Priority:
+            if reserved and priority == Priority.COSMETIC:
+                break
+            queue = self._queues[priority]
+            if queue:
+                job = queue.popleft()
+                if job.key is not None:
+                    self._pending.pop(job.key, None)
+                return job
+        return None
+
+    async def _worker(self, reserved: bool) -> None:
+        while True:
+            async with self._cond:
+                job = self._pop(reserved)
+                while job is None:
+                    await self._cond.wait()
+                    job = self._pop(reserved)
+            stats = self._stats[job.priority]
+            wait = time.monotonic() - job.enqueued_at
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+            self._running += 1
+            try:
+                result = await job.run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                stats.failed += 1
+                stats.completed += 1
+                if job.future and not job.future.done():
+                    job.future.set_exception(e)
+                continue
+            finally:
+                self._running -= 1
+            stats.completed += 1
+            if job.future and not job.future.done():
+                job.future.set_result(result)
+
+    def _enqueue(self, job: _Job) -> None:
+        self._ensure_started()
+        self._stats[job.priority].submitted += 1
+        self._queues[job.priority].append(job)
+
+        async def notify():
+            async with self._cond:
+                self._cond.notify_all()
+        asyncio.get_running_loop().create_task(notify())
+
+    # Generic submission
+    def submit(self, priority: Priority, factory: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(_Job(priority, factory, future=future))
+        return future
+
+    # Role edits: pending edits to one member collapse into one add_roles
+    # and one remove_roles call
+    def edit_roles(
+        self,
+        member: discord.Member,
+        add: List[discord.abc.Snowflake] = (),
+        remove: List[discord.abc.Snowflake] = (),
+        reason: Optional[str] = None,
+        priority: Priority = Priority.MODERATION,
+    ) -> asyncio.Future:
+        key = ("roles", member.guild.id, member.id)
+        pending = self._pending.get(key)
+        if pending is None:
+            edit = _RoleEdit(member)
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = (edit, future, priority)
+            if key not in self._roles_running:
+                self._enqueue_roles(key, edit, future, priority)
+        else:
+            edit, future, _priority = pending
+            edit.member = member
+            self._stats[priority].coalesced += 1
+        for role in add:
+            edit.remove.pop(role.id, None)
+            edit.add[role.id] = role
+        for role in remove:
+            edit.add.pop(role.id, None)
+            edit.remove[role.id] = role
+        if reason and reason not in edit.reasons:
+            edit.reasons.append(reason)
+        return future
+
+    def _enqueue_roles(self, key: Hashable, edit: _RoleEdit, future: asyncio.Future, priority: Priority) -> None:
+        self._enqueue(_Job(priority, lambda: self._run_roles(key, edit), key=key, future=future))
+
+    async def _run_roles(self, key: Hashable, edit: _RoleEdit) -> None:
+        # One role job per member at a time, otherwise e.g. a reprimand role
+        # change could race a cleanup and the final roles would depend on
+        # API ordering
+        self._roles_running.add(key)
+        try:
+            await self._apply_roles(edit)
+        finally:
+            self._roles_running.discard(key)
+            follow_up = self._pending.get(key)
+            if follow_up is not None:
+                self._enqueue_roles(key, *follow_up)
+
+    async def _apply_roles(self, edit: _RoleEdit) -> None:
+        # Per-role (atomic) add/remove instead of replacing the whole role
+        # list from a possibly stale cache, so concurrent changes made by
+        # admins or other bots are not undone
+        reason = "; ".join(edit.reasons) or None
+        if edit.add:
+            await edit.member.add_roles(*edit.add.values(), reason=reason)
+        if edit.remove:
+            await edit.member.remove_roles(*edit.remove.values(), reason=reason)
+
+    # Message deletes: grouped per channel and sent as bulk deletes
+    def delete_message(self, message: discord.Message, delay: Optional[float] = None, priority: Priority = Priority.COSMETIC) -> None:
+        if delay:
+            key = (message.channel.id, message.id)
+            previous = self._delayed.pop(key, None)
+            if previous:
+                previous[2].cancel()
+            handle = asyncio.get_running_loop().call_later(delay, self._fire_delayed, key, message, priority)
+            self._delayed[key] = (time.time() + delay, priority, handle)
+            return
+        key = ("delete", message.channel.id)
+        pending = self._pending.get(key)
+        if pending is None:
+            batch: Dict[int, discord.Message] = {}
+            self._pending[key] = batch
+            self._enqueue(_Job(priority, lambda: self._apply_deletes(message.channel, batch), key=key))
+        else:
+            batch = pending
+            self._stats[priority].coalesced += 1
+        batch[message.id] = message
+
+    def _fire_delayed(self, key: Tuple[int, int], message: discord.Message, priority: Priority) -> None:
+        self._delayed.pop(key, None)
+        self.delete_message(message, None, priority)
+
+    def delayed_deletes(self) -> List[List[float]]:
+        # [channel_id, message_id, due, priority] for the warm-start file
+        return [[cid, mid, due, int(priority)] for (cid, mid), (due, priority, _h) in self._delayed.items()]
+
+    def cancel_delayed(self) -> None:
+        for _due, _priority, handle in self._delayed.values():
+            handle.cancel()
+        self._delayed.clear()
+
+    async def _apply_deletes(self, channel: Any, batch: Dict[int, discord.Message]) -> None:
+        cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        recent = [m for m in batch.values() if m.created_at > cutoff]
+        single = [m for m in batch.values() if m.created_at <= cutoff]
+        if len(recent) < 2 or not hasattr(channel, "delete_messages"):
+            single.extend(recent)
+            recent = []
+        for i in range(0, len(recent), BULK_CHUNK_SIZE):
+            chunk = recent[i:i + BULK_CHUNK_SIZE]
+            try:
+                await channel.delete_messages(chunk)
+            except discord.HTTPException:
+                single.extend(chunk)
+        for message in single:
+            try:
+                await message.delete()
+            except discord.HTTPException:
+                pass
+
+    def add_reaction(self, message: discord.Message, emoji: str, priority: Priority = Priority.COSMETIC) -> asyncio.Future:
+        future = self.submit(priority, lambda: message.add_reaction(emoji))
+        # Fire-and-forget callers never await it; a failed cosmetic reaction
+        # must not end up as "Future exception was never retrieved"
+        future.add_done_callback(_ignore_result)
+        return future
+
+    # Metrics
+    def metrics(self) -> Dict[Priority, Dict[str, float]]:
+        return {
+            p: {
+                "depth": len(self._queues[p]),
+                "delayed": sum(1 for _d, priority, _h in self._delayed.values() if priority == p),
+                "submitted": s.submitted,
+                "completed": s.completed,
+                "failed": s.failed,
+                "coalesced": s.coalesced,
+                "avg_wait": s.avg_wait,
+                "max_wait": s.max_wait,
+            }
+            for p, s in self._stats.items()
+        }
+
+
+def _ignore_result(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
@@ -1,7 +1,9 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional
 import discord
 
+from .request_scheduler import RequestScheduler
+
 
 @dataclass
 class RoleIDs:
@@ -12,40 +14,52 @@ class RoleIDs:
 
 
 class RoleManager:
-    def __init__(self, guild: discord.Guild, roles: RoleIDs):
+    def __init__(self, guild: discord.Guild, roles: RoleIDs, scheduler: Optional[RequestScheduler] = None):
         self.guild = guild
         self.roles = roles
+        self.scheduler = scheduler
+        self._role_cache: Dict[int, Optional[discord.Role]] = {}
 
     def get_role(self, role_id: int) -> Optional[discord.Role]:
-        return self.guild.get_role(role_id)
+        if role_id not in self._role_cache:
+            self._role_cache[role_id] = self.guild.get_role(role_id)
+        return self._role_cache[role_id]
+
+    def clear_cache(self) -> None:
+        self._role_cache.clear()
 
     async def ensure_roles_exist(self) -> bool:
         needed = [self.roles.leader, self.roles.deputy, self.roles.reprimand_1, self.roles.reprimand_2]
         return all(self.get_role(r) is not None for r in needed)
 
+    async def _edit(self, member: discord.Member, add=(), remove=(), reason: str = "HorizontRP Bot role edit"):
+        # Through the scheduler, edits to one member are merged into a single request
+        add = [r for r in (self.get_role(i) for i in add) if r and r not in member.roles]
+        remove = [r for r in (self.get_role(i) for i in remove) if r and r in member.roles]
+        if not (add or remove):
+            return
+        if self.scheduler:
+            await self.scheduler.edit_roles(member, add=add, remove=remove, reason=reason)
+            return
+        if remove:
+            await member.remove_roles(*remove, reason=reason)
+        if add:
+            await member.add_roles(*add, reason=reason)
+
     async def add_role(self, member: discord.Member, role_id: int):
-        role = self.get_role(role_id)
-        if role and role not in member.roles:
-            await member.add_roles(role, reason="HorizontRP Bot role add")
+        await self._edit(member, add=[role_id], reason="HorizontRP Bot role add")
 
     async def remove_role(self, member: discord.Member, role_id: int):
-        role = self.get_role(role_id)
-        if role and role in member.roles:
-            await member.remove_roles(role, reason="HorizontRP Bot role remove")
+        await self._edit(member, remove=[role_id], reason="HorizontRP Bot role remove")
 
     async def remove_roles(self, member: discord.Member, *role_ids: int):
-        roles = [self.get_role(r) for r in role_ids]
-        roles = [r for r in roles if r and r in member.roles]
-        if roles:
-            await member.remove_roles(*roles, reason="HorizontRP Bot bulk role remove")
+        await self._edit(member, remove=role_ids, reason="HorizontRP Bot bulk role remove")
 
     async def set_leader(self, member: discord.Member):
-        await self.remove_role(member, self.roles.deputy)
-        await self.add_role(member, self.roles.leader)
+        await self._edit(member, add=[self.roles.leader], remove=[self.roles.deputy])
 
     async def set_deputy(self, member: discord.Member):
-        await self.remove_role(member, self.roles.leader)
-        await self.add_role(member, self.roles.deputy)
+        await self._edit(member, add=[self.roles.deputy], remove=[self.roles.leader])
 
     async def clear_punishment_roles(self, member: discord.Member):
         await self.remove_roles(member, self.roles.reprimand_1, self.roles.reprimand_2)
@@ -53,8 +67,6 @@ class RoleManager:
     async def apply_reprimand_role(self, member: discord.Member, count: int):
         # 1 -> reprimand_1, 2 -> reprimand_2, 3 -> handled externally (dismissal)
         if count == 1:
-            await self.remove_role(member, self.roles.reprimand_2)
-            await self.add_role(member, self.roles.reprimand_1)
+            await self._edit(member, add=[self.roles.reprimand_1], remove=[self.roles.reprimand_2])
         elif count == 2:
-            await self.remove_role(member, self.roles.reprimand_1)
-            await self.add_role(member, self.roles.reprimand_2)
+            await self._edit(member, add=[self.roles.reprimand_2], remove=[self.roles.reprimand_1])
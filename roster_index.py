@@ -0,0 +1,69 @@
+import bisect
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .data_manager import DataManager
+
+
+def _search(sorted_keys: List[Tuple[str, str]], current: str, limit: int) -> List[str]:
+    # Prefix hits via bisect first, then substring hits to fill up the list
+    needle = current.strip().lower()
+    if not needle:
+        return [value for _key, value in sorted_keys[:limit]]
+    result: List[str] = []
+    i = bisect.bisect_left(sorted_keys, (needle, ""))
+    while i < len(sorted_keys) and sorted_keys[i][0].startswith(needle) and len(result) < limit:
+        result.append(sorted_keys[i][1])
+        i += 1
+    if len(result) < limit:
+        seen = set(result)
+        for key, value in sorted_keys:
+            if needle in key and value not in seen:
+                result.append(value)
+                if len(result) >= limit:
+                    break
+    return result
+
+
+class RosterIndex:
+    # In-memory view of the roster for autocomplete; rebuilt only when the
+    # data file's mtime changes, so a keystroke costs one stat() call.
+    def __init__(self, dm: DataManager):
+        self.dm = dm
+        self._mtime: Optional[int] = None
+        self._nicknames: Dict[str, List[Tuple[str, str]]] = {}
+        self._organizations: List[Tuple[str, str]] = []
+
+    def _refresh(self) -> None:
+        try:
+            mtime = os.stat(self.dm.data_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        data = self.dm.load()
+        orgs = set()
+        self._nicknames = {}
+        for category in ("leaders", "deputies"):
+            people = data.get(category, {})
+            self._nicknames[category] = sorted((nick.lower(), nick) for nick in people)
+            for info in people.values():
+                org = info.get("організація") or info.get("organization")
+                if org:
+                    orgs.add(org)
+        self._nicknames["*"] = sorted(self._nicknames["leaders"] + self._nicknames["deputies"])
+        self._organizations = sorted((org.lower(), org) for org in orgs)
+        self._mtime = mtime
+
+    def nicknames(self, current: str, category: Optional[str] = None, limit: int = 25) -> List[str]:
+        # category: "leaders", "deputies" or None for both
+        self._refresh()
+        return _search(self._nicknames.get(category or "*", []), current, limit)
+
+    def organizations(self, current: str, limit: int = 25) -> List[str]:
+        self._refresh()
+        return _search(self._organizations, current, limit)
+
+    def size(self) -> int:
+        self._refresh()
+        return len(self._nicknames.get("*", []))
@@ -0,0 +1,185 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+SNAPSHOT_PREFIX = "leaders_data-"
+SNAPSHOT_SUFFIX = ".json.gz"
+# Undo copies taken before a restore; never thinned by the hourly/daily rules
+PRE_RESTORE_TAG = "pre-restore-"
+STAMP_FMT = "%Y%m%d-%H%M%S"
+
+
+class SnapshotStore:
+    # Compressed copies of the roster. take()/prune() do blocking file I/O and
+    # are meant to run in an executor; the caller hands over a dict it no
+    # longer mutates, so the snapshot is consistent.
+    def __init__(self, directory: str, keep_hourly: int = 24, keep_daily: int = 14, keep_pre_restore: int = 10, keep_recent: int = 3):
+        self.directory = directory
+        self.keep_recent = keep_recent
+        self.keep_hourly = keep_hourly
+        self.keep_daily = keep_daily
+        self.keep_pre_restore = keep_pre_restore
+        self._last_digest: Optional[str] = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, stamp: str, pre_restore: bool = False) -> str:
+        tag = PRE_RESTORE_TAG if pre_restore else ""
+        return os.path.join(self.directory, f"{SNAPSHOT_PREFIX}{tag}{stamp}{SNAPSHOT_SUFFIX}")
+
+    @staticmethod
+    def is_pre_restore(path: str) -> bool:
+        return os.path.basename(path).startswith(SNAPSHOT_PREFIX + PRE_RESTORE_TAG)
+
+    def list(self) -> List[Tuple[datetime, str]]:
+        # Both regular and pre-restore snapshots, oldest first
+        result = []
+        for name in os.listdir(self.directory):
+            if not (name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX)):
+                continue
+            stamp = name[len(SNAPSHOT_PREFIX):-len(SNAPSHOT_SUFFIX)]
+            if stamp.startswith(PRE_RESTORE_TAG):
+                stamp = stamp[len(PRE_RESTORE_TAG):]
+            try:
+                result.append((datetime.strptime(stamp, STAMP_FMT), os.path.join(self.directory, name)))
+            except ValueError:
+                continue
+        result.sort()
+        return result
+
+    def _latest_digest(self) -> Optional[str]:
+        if self._last_digest is None:
+            snapshots = [s for s in self.list() if not self.is_pre_restore(s[1])]
+            if snapshots:
+                self._last_digest = hashlib.sha256(self._read_raw(snapshots[-1][1])).hexdigest()
+        return self._last_digest
+
+    @staticmethod
+    def _read_raw(path: str) -> bytes:
+        with gzip.open(path, "rb") as f:
+            return f.read()
+
+    def take(self, data: Dict[str, Any], pre_restore: bool = False) -> Optional[str]:
+        # Incremental: nothing is written when the roster did not change.
+        # Pre-restore snapshots are always written and kept as their own series.
+        raw = json.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        if not pre_restore and digest == self._latest_digest():
+            return None
+        when = datetime.now()
+        # Stamps stay unique across both series so find() is unambiguous; the
+        # name is reserved with an exclusive create, so a concurrent writer
+        # (another process, the CLI) can never get the same file
+        while True:
+            stamp = when.strftime(STAMP_FMT)
+            path = self._path(stamp, pre_restore)
+            if not os.path.exists(self._path(stamp, not pre_restore)):
+                try:
+                    open(path, "xb").close()
+                    break
+                except FileExistsError:
+                    pass
+            when += timedelta(seconds=1)
+        tmp = path + ".tmp"
+        with gzip.open(tmp, "wb", compresslevel=6) as f:
+            f.write(raw)
+        os.replace(tmp, path)
+        if not pre_restore:
+            self._last_digest = digest
+        self.prune()
+        return path
+
+    def prune(self) -> int:
+        # Keeps the newest keep_recent snapshots whatever their time, the
+        # newest of each of the last N hours and N days, plus the newest
+        # keep_pre_restore undo copies
+        now = datetime.now()
+        snapshots = self.list()
+        pre_restore = [path for _stamp, path in snapshots if self.is_pre_restore(path)]
+        regular = [path for _stamp, path in snapshots if not self.is_pre_restore(path)]
+        keep = set(pre_restore[-self.keep_pre_restore:]) if self.keep_pre_restore else set()
+        if self.keep_recent:
+            keep.update(regular[-self.keep_recent:])
+        seen_hours, seen_days = set(), set()
+        for stamp, path in reversed(snapshots):
+            if self.is_pre_restore(path):
+                continue
+            hour = stamp.replace(minute=0, second=0, microsecond=0)
+            day = stamp.date()
+            if now - hour < timedelta(hours=self.keep_hourly) and hour not in seen_hours:
+                seen_hours.add(hour)
+                keep.add(path)
+            if (now.date() - day).days < self.keep_daily and day not in seen_days:
+                seen_days.add(day)
+                keep.add(path)
+        removed = 0
+        for _stamp, path in snapshots:
+            if path not in keep:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    # Already pruned by a concurrent take()
+                    continue
+                removed += 1
+        return removed
+
+    def find(self, stamp: str) -> Optional[Tuple[datetime, str]]:
+        # Accepts a full stamp (20251216-2143..) or a prefix; newest match wins
+        stamp = stamp.strip()
+        matches = [s for s in self.list() if s[0].strftime(STAMP_FMT).startswith(stamp)]
+        return matches[-1] if matches else None
+
+    def load(self, path: str) -> Dict[str, Any]:
+        return json.loads(self._read_raw(path).decode("utf-8"))
+
+
+def take_snapshot_job(directory: str, keep_hourly: int, keep_daily: int, data: Dict[str, Any], pre_restore: bool = False, progress=None) -> Optional[str]:
+    # Entry point for the worker pool: serialization + gzip run off the event loop
+    return SnapshotStore(directory, keep_hourly, keep_daily).take(data, pre_restore=pre_restore)
+
+
+def write_data_file(data: Dict[str, Any], data_path: str) -> None:
+    tmp = data_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, data_path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="List or restore leaders_data.json snapshots")
+    parser.add_argument("--dir", default="snapshots", help="snapshot directory")
+    parser.add_argument("--data", default="leaders_data.json", help="live data file to restore into")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list")
+    restore = sub.add_parser("restore")
+    restore.add_argument("timestamp", help="YYYYmmdd-HHMMSS or a prefix of it")
+    args = parser.parse_args(argv)
+
+    store = SnapshotStore(args.dir)
+    if args.command == "list":
+        for stamp, path in store.list():
+            kind = "pre-restore" if store.is_pre_restore(path) else "hourly"
+            print(f"{stamp.strftime(STAMP_FMT)}  {kind:<11}  {os.path.getsize(path):>8} B  {path}")
+        return 0
+    found = store.find(args.timestamp)
+    if not found:
+        print(f"No snapshot matching {args.timestamp!r}", file=sys.stderr)
+        return 1
+    data = store.load(found[1])
+    # The current file is snapshotted first so a restore can be undone
+    try:
+        with open(args.data, "r", encoding="utf-8") as f:
+            store.take(json.load(f), pre_restore=True)
+    except (OSError, ValueError):
+        pass
+    write_data_file(data, args.data)
+    print(f"Restored {args.data} from {found[1]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+from ..audit_log import AuditEvent, AuditLog, paginate, parse_log_file, parse_log_line
+
+LEGACY_LINES = [
+    "[16.12.2025 21:00] admin додав(ла) John_Doe як керівника у LSPD - Шеф\n",
+    "[16.12.2025 21:05] admin видав(ла) ПОПЕРЕДЖЕННЯ John_Doe: Запізнення (разом 1)\n",
+    "[16.12.2025 21:10] something the parser does not know\n",
+]
+
+
+def make_log(tmp_path, max_events=None):
+    return AuditLog(str(tmp_path / "audit.jsonl"), max_events=max_events)
+
+
+def record_at(audit, ts, actor, action, target=None, **details):
+    event = AuditEvent(ts, actor, action, target, details)
+    audit._append([event])
+    audit._index(event)
+    audit._trim()
+    return event
+
+
+def test_parse_log_line_formats():
+    added = parse_log_line(LEGACY_LINES[0])
+    assert (added.actor, added.action, added.target) == ("admin", "add_person", "John_Doe")
+    assert added.details == {"org": "LSPD", "position": "Шеф", "category": "leaders"}
+    warning = parse_log_line(LEGACY_LINES[1])
+    assert warning.details["count"] == "1"
+    assert parse_log_line(LEGACY_LINES[2]).action == "other"
+    assert parse_log_line("no timestamp") is None
+
+
+def test_parse_log_file_respects_byte_limit(tmp_path):
+    path = tmp_path / "bot_logs.txt"
+    path.write_text("".join(LEGACY_LINES), encoding="utf-8")
+    limit = len(LEGACY_LINES[0].encode("utf-8"))
+    assert [e.action for e in parse_log_file(str(path), limit)] == ["add_person"]
+    assert len(parse_log_file(str(path))) == 3
+
+
+def test_query_by_actor_target_and_time(tmp_path):
+    audit = make_log(tmp_path)
+    record_at(audit, 1000.0, "Admin", "add_person", "John_Doe", member_id=42)
+    record_at(audit, 2000.0, "admin", "warning", "john_doe", member_id=42)
+    record_at(audit, 3000.0, "other", "warning", "Jane_Doe")
+    assert [e.ts for e in audit.query(actor="ADMIN")] == [2000.0, 1000.0]
+    assert len(audit.query(target="John_Doe")) == 2
+    # The member ID finds the person under any nickname
+    assert len(audit.query(target=["Renamed", "42"])) == 2
+    assert [e.ts for e in audit.query(since=1500.0, until=2500.0)] == [2000.0]
+    assert audit.query(actor="admin", target="jane_doe") == []
+
+
+def test_events_survive_reload(tmp_path):
+    audit = make_log(tmp_path)
+    audit.record("admin", "warning", "John_Doe", member_id=42)
+    reloaded = make_log(tmp_path)
+    assert [e.action for e in reloaded.query(target="42")] == ["warning"]
+
+
+def test_backfill_marker_survives_restart(tmp_path):
+    legacy = tmp_path / "bot_logs.txt"
+    legacy.write_text("".join(LEGACY_LINES[:2]), encoding="utf-8")
+    audit = AuditLog(str(tmp_path / "audit.jsonl"), str(legacy))
+    assert audit.pending_backfill == str(legacy)
+    audit.record("admin", "config_reload")
+    with open(legacy, "a", encoding="utf-8") as f:
+        f.write(LEGACY_LINES[2])
+    restarted = AuditLog(str(tmp_path / "audit.jsonl"), str(legacy))
+    assert restarted.pending_backfill == str(legacy)
+    assert restarted.backfill(restarted.pending_backfill, restarted.backfill_limit) == 2
+    assert restarted.pending_backfill is None
+    assert AuditLog(str(tmp_path / "audit.jsonl"), str(legacy)).pending_backfill is None
+
+
+def test_max_events_keeps_newest_in_memory_and_archive_on_disk(tmp_path):
+    audit = make_log(tmp_path, max_events=10)
+    for i in range(30):
+        record_at(audit, 1000.0 + i, "admin", "warning", f"user{i % 3}")
+    assert len(audit.events) <= 11
+    assert min(e.ts for e in audit.events) >= audit.archived_before
+    recent = audit.query(target="user0")
+    archived = audit.query_archive(target="user0")
+    assert sorted(e.ts for e in recent + archived) == [1000.0 + i for i in range(0, 30, 3)]
+    assert all(e.ts < audit.archived_before for e in archived)
+    # A restart loads only the newest events as well
+    assert len(make_log(tmp_path, max_events=10).events) <= 11
+
+
+def test_paginate():
+    events = [AuditEvent(float(i), None, "other") for i in range(25)]
+    items, pages = paginate(events, 3, per_page=10)
+    assert pages == 3 and len(items) == 5
+    assert paginate(events, 99, per_page=10)[0] == items
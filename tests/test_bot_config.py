@@ -0,0 +1,109 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("discord")
+
+from ..bot_config import BotConfig, ConfigError, ConfigWatcher, load_config, parse_config
+from ..command_guard import RateQuota
+from ..role_manager import RoleIDs
+
+DEFAULTS = BotConfig(
+    role_ids=RoleIDs(1, 2, 3, 4),
+    admin_roles=("Admin",),
+    warnings_per_reprimand=3,
+    max_reprimands=3,
+    news_ttl_hours=24,
+    auto_delete_seconds=10,
+    warning_expiry_days=0,
+    reprimand_expiry_days=0,
+    rate_limits={"default": RateQuota(5, 10)},
+    duplicate_window_seconds=5,
+    coalesce_window_seconds=3,
+)
+
+
+def write(path, content):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content if isinstance(content, str) else json.dumps(content))
+
+
+def test_missing_keys_keep_defaults_and_rate_limits_merge():
+    cfg = parse_config({"max_reprimands": 5, "rate_limits": {"clear": {"burst": 1, "per_seconds": 60}}}, DEFAULTS)
+    assert cfg.max_reprimands == 5
+    assert cfg.warnings_per_reprimand == 3
+    assert cfg.rate_limits == {"default": RateQuota(5, 10), "clear": RateQuota(1, 60.0)}
+
+
+def test_role_ids_accept_numeric_strings():
+    cfg = parse_config({"role_ids": {"leader": "11", "deputy": 12, "reprimand_1": 13, "reprimand_2": 14}}, DEFAULTS)
+    assert cfg.role_ids == RoleIDs(11, 12, 13, 14)
+
+
+@pytest.mark.parametrize("raw", [
+    [],
+    {"typo_key": 1},
+    {"max_reprimands": 0},
+    {"max_reprimands": True},
+    {"admin_roles": "Admin"},
+    {"role_ids": {"leader": 1}},
+    {"role_ids": {"leader": 1, "deputy": 2, "reprimand_1": 3, "reprimand_2": -4}},
+    {"rate_limits": {"default": {"burst": 0, "per_seconds": 10}}},
+    {"rate_limits": {"default": {"burst": 1}}},
+])
+def test_invalid_values_are_rejected(raw):
+    with pytest.raises(ConfigError):
+        parse_config(raw, DEFAULTS)
+
+
+def test_load_config_reports_unreadable_files(tmp_path):
+    path = str(tmp_path / "config.json")
+    assert load_config(path, DEFAULTS) is DEFAULTS
+    write(path, "{broken")
+    with pytest.raises(ConfigError, match="invalid JSON"):
+        load_config(path, DEFAULTS)
+    with open(path, "wb") as f:
+        f.write(b'{"admin_roles": ["\xff"]}')
+    with pytest.raises(ConfigError, match="UTF-8"):
+        load_config(path, DEFAULTS)
+    with pytest.raises(ConfigError, match="cannot read"):
+        load_config(str(tmp_path), DEFAULTS)
+
+
+def test_watcher_reloads_only_on_change(tmp_path):
+    path = str(tmp_path / "config.json")
+    write(path, {"max_reprimands": 4})
+    watcher = ConfigWatcher(path, DEFAULTS)
+    assert watcher.load().max_reprimands == 4
+    assert watcher.check() is None
+    write(path, {"max_reprimands": 5})
+    os.utime(path, (1, 1))
+    assert watcher.check().max_reprimands == 5
+    # A broken file is reported once, not on every poll
+    write(path, "{broken")
+    os.utime(path, (2, 2))
+    with pytest.raises(ConfigError):
+        watcher.check()
+    assert watcher.check() is None
+
+
+def test_watcher_keeps_settings_when_file_is_deleted(tmp_path):
+    path = str(tmp_path / "config.json")
+    write(path, {"max_reprimands": 4})
+    watcher = ConfigWatcher(path, DEFAULTS)
+    watcher.load()
+    os.remove(path)
+    with pytest.raises(ConfigError, match="missing"):
+        watcher.check()
+    assert watcher.check() is None
+    with pytest.raises(ConfigError, match="missing"):
+        watcher.load()
+    write(path, {"max_reprimands": 6})
+    assert watcher.check().max_reprimands == 6
+
+
+def test_watcher_without_file_uses_defaults(tmp_path):
+    watcher = ConfigWatcher(str(tmp_path / "config.json"), DEFAULTS)
+    assert watcher.load() is DEFAULTS
+    assert watcher.check() is None
@@ -0,0 +1,70 @@
+import asyncio
+
+from ..command_guard import RETRY, DuplicateGuard, RateLimiter, RateQuota, ResponseCoalescer
+
+
+def test_rate_limiter_allows_burst_then_refills():
+    limiter = RateLimiter({"default": RateQuota(2, 10)})
+    assert limiter.acquire(1, "stats", now=0.0) == (0.0, False)
+    assert limiter.acquire(1, "stats", now=0.0) == (0.0, False)
+    retry_after, notify = limiter.acquire(1, "stats", now=0.0)
+    assert retry_after == 5.0 and notify
+    # Only the first rejection of a streak is reported
+    assert limiter.acquire(1, "stats", now=1.0)[1] is False
+    assert limiter.acquire(1, "stats", now=5.0) == (0.0, False)
+
+
+def test_rate_limiter_buckets_are_per_user_and_command():
+    limiter = RateLimiter({"default": RateQuota(1, 10), "clear": RateQuota(1, 60)})
+    assert limiter.acquire(1, "stats", now=0.0)[0] == 0.0
+    assert limiter.acquire(2, "stats", now=0.0)[0] == 0.0
+    assert limiter.acquire(1, "clear", now=0.0)[0] == 0.0
+    assert limiter.acquire(1, "clear", now=10.0)[0] == 50.0
+
+
+def test_rate_limiter_without_quota_never_limits():
+    limiter = RateLimiter({})
+    for _ in range(10):
+        assert limiter.acquire(1, "stats") == (0.0, False)
+
+
+def test_duplicate_guard_window_and_release():
+    guard = DuplicateGuard(window=5)
+    key = (1, "warning", "john_doe")
+    assert guard.check(key, now=0.0) == 0.0
+    assert guard.check(key, now=2.0) == 3.0
+    assert guard.check((2, "warning", "john_doe"), now=2.0) == 0.0
+    guard.release(key)
+    assert guard.check(key, now=2.5) == 0.0
+    assert guard.check(key, now=8.0) == 0.0
+
+
+def test_duplicate_guard_disabled():
+    guard = DuplicateGuard(window=0)
+    assert guard.check("key") == 0.0
+    assert guard.check("key") == 0.0
+
+
+def test_coalescer_shares_first_reply():
+    async def run():
+        coalescer = ResponseCoalescer(window=3)
+        assert coalescer.join("key", now=0.0) is None
+        shared = coalescer.join("key", now=1.0)
+        coalescer.resolve("key", "reply")
+        assert await shared == "reply"
+        # The window is over: the next caller produces its own reply
+        assert coalescer.join("key", now=4.0) is None
+
+    asyncio.run(run())
+
+
+def test_coalescer_discard_tells_waiters_to_retry():
+    async def run():
+        coalescer = ResponseCoalescer(window=3)
+        assert coalescer.join("key", now=0.0) is None
+        shared = coalescer.join("key", now=1.0)
+        coalescer.discard("key")
+        assert await shared is RETRY
+        assert coalescer.join("key", now=1.5) is None
+
+    asyncio.run(run())
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+from ..expiry_queue import Expiry, ExpiryQueue
+
+
+def test_expiries_fire_in_deadline_order():
+    async def run():
+        fired = []
+
+        async def handler(expiry):
+            fired.append(expiry.nickname)
+
+        queue = ExpiryQueue(handler)
+        queue.start()
+        now = time.time()
+        queue.schedule(Expiry(now + 0.15, "leaders", "late", "warnings"))
+        queue.schedule(Expiry(now + 0.05, "leaders", "early", "warnings"))
+        assert queue.next_deadline() == now + 0.05
+        await asyncio.sleep(0.3)
+        await queue.stop()
+        return fired, len(queue)
+
+    assert asyncio.run(run()) == (["early", "late"], 0)
+
+
+def test_load_rebuilds_heap_and_fires_past_deadlines():
+    async def run():
+        fired = []
+
+        async def handler(expiry):
+            fired.append(expiry.nickname)
+
+        queue = ExpiryQueue(handler)
+        now = time.time()
+        queue.load([Expiry(now + 60, "deputies", "future", "reprimands"), Expiry(now - 60, "deputies", "past", "reprimands")])
+        queue.start()
+        await asyncio.sleep(0.05)
+        await queue.stop()
+        return fired, len(queue)
+
+    assert asyncio.run(run()) == (["past"], 1)
+
+
+def test_failing_handler_is_logged_and_queue_keeps_running():
+    async def run():
+        fired, logged = [], []
+
+        async def handler(expiry):
+            if expiry.nickname == "broken":
+                raise RuntimeError("boom")
+            fired.append(expiry.nickname)
+
+        queue = ExpiryQueue(handler, log=logged.append)
+        queue.start()
+        now = time.time()
+        queue.schedule(Expiry(now, "leaders", "broken", "warnings"))
+        queue.schedule(Expiry(now + 0.05, "leaders", "ok", "warnings"))
+        await asyncio.sleep(0.15)
+        await queue.stop()
+        return fired, logged
+
+    fired, logged = asyncio.run(run())
+    assert fired == ["ok"]
+    assert len(logged) == 1 and "RuntimeError: boom" in logged[0]
+
+
+def test_expire_punishments_moves_due_entries_and_renumbers(tmp_path):
+    from ..data_manager import DataManager
+
+    dm = DataManager(str(tmp_path / "data.json"), str(tmp_path / "log.txt"))
+    dm.set_person("leaders", "John_Doe", {"warnings": [], "reprimands": []})
+    dm.add_reprimand("leaders", "John_Doe", "first", "admin", expires_at=100.0)
+    dm.add_reprimand("leaders", "John_Doe", "second", "admin", expires_at=200.0)
+    assert dm.expire_punishments("leaders", "John_Doe", "reprimands", 150.0) == 1
+    person = dm.get_person("leaders", "John_Doe")
+    assert [(r["reason"], r["number"]) for r in person["reprimands"]] == [("second", 1)]
+    assert [r["reason"] for r in person["expired_reprimands"]] == ["first"]
+    # Nothing left to expire at that time, or the person is gone
+    assert dm.expire_punishments("leaders", "John_Doe", "reprimands", 150.0) is None
+    assert dm.expire_punishments("leaders", "Nobody", "reprimands", 150.0) is None
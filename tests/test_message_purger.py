@@ -0,0 +1,110 @@
+import asyncio
+import re
+from datetime import timedelta
+
+import pytest
+
+discord = pytest.importorskip("discord")
+
+from ..message_purger import PurgeFilter, compile_pattern, filtered_purge
+
+
+class FakeResponse:
+    status = 500
+    reason = "Internal Server Error"
+
+
+class FakeAuthor:
+    def __init__(self, user_id, bot=False):
+        self.id = user_id
+        self.bot = bot
+
+
+class FakeMessage:
+    def __init__(self, channel, message_id, content="", author=None, age=timedelta(minutes=1)):
+        self.channel = channel
+        self.id = message_id
+        self.content = content
+        self.author = author or FakeAuthor(1)
+        self.created_at = discord.utils.utcnow() - age
+
+    async def delete(self):
+        self.channel.single.append(self.id)
+
+
+class FakeChannel:
+    def __init__(self, bulk_error=None):
+        self.messages = []
+        self.bulk = []
+        self.single = []
+        self.bulk_error = bulk_error
+        self.history_limit = "unset"
+
+    def add(self, content="", author=None, age=timedelta(minutes=1)):
+        message = FakeMessage(self, len(self.messages) + 1, content, author, age)
+        self.messages.append(message)
+        return message
+
+    async def history(self, limit=None, before=None, after=None, oldest_first=False):
+        self.history_limit = limit
+        for message in reversed(self.messages[-limit:] if limit else self.messages):
+            yield message
+
+    async def delete_messages(self, messages):
+        if self.bulk_error:
+            raise self.bulk_error
+        self.bulk.extend(m.id for m in messages)
+
+
+def purge(channel, amount, flt, **kwargs):
+    return asyncio.run(filtered_purge(channel, amount, flt, single_delay=0, **kwargs))
+
+
+def test_filter_matches():
+    bot = FakeAuthor(2, bot=True)
+    channel = FakeChannel()
+    flt = PurgeFilter(user_ids={2}, contains="Nitro", pattern=compile_pattern(r"discord\.gg/\S+"))
+    assert flt.active and not PurgeFilter().active
+    assert flt.matches(FakeMessage(channel, 1, "free nitro discord.gg/abc", bot))
+    assert not flt.matches(FakeMessage(channel, 2, "free nitro", bot))
+    assert not flt.matches(FakeMessage(channel, 3, "free nitro discord.gg/abc", FakeAuthor(3)))
+    assert PurgeFilter(bots_only=True).matches(FakeMessage(channel, 4, "", bot))
+    assert compile_pattern("(") is None
+    assert isinstance(compile_pattern("a"), re.Pattern)
+
+
+def test_recent_matches_are_bulk_deleted_old_ones_singly():
+    channel = FakeChannel()
+    old = [channel.add("spam", age=timedelta(days=20)) for _ in range(2)]
+    recent = [channel.add("spam") for _ in range(3)]
+    channel.add("keep")
+    progress = purge(channel, 10, PurgeFilter(contains="spam"))
+    assert sorted(channel.bulk) == [m.id for m in recent]
+    assert sorted(channel.single) == [m.id for m in old]
+    assert (progress.deleted, progress.scanned, progress.stopped) == (5, 6, None)
+
+
+def test_scan_stops_at_max_scan():
+    channel = FakeChannel()
+    for _ in range(50):
+        channel.add("keep")
+    progress = purge(channel, 10, PurgeFilter(contains="spam"), max_scan=20)
+    assert channel.history_limit == 20
+    assert (progress.scanned, progress.deleted, progress.stopped) == (20, 0, "scan")
+
+
+def test_scan_stops_at_bulk_horizon():
+    channel = FakeChannel()
+    channel.add("spam", age=timedelta(days=20))
+    channel.add("spam")
+    progress = purge(channel, 10, PurgeFilter(contains="spam"), stop_at_horizon=True)
+    assert (progress.deleted, progress.stopped) == (1, "age")
+    assert channel.single == []
+
+
+def test_failed_bulk_delete_falls_back_to_single_deletes():
+    channel = FakeChannel(bulk_error=discord.HTTPException(FakeResponse(), "bulk delete failed"))
+    messages = [channel.add("spam") for _ in range(3)]
+    progress = purge(channel, 10, PurgeFilter())
+    assert sorted(channel.single) == [m.id for m in messages]
+    assert progress.single_deleted == 3 and progress.bulk_deleted == 0
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("discord")
+
+from ..request_scheduler import Priority, RequestScheduler
+
+
+class FakeRole:
+    def __init__(self, role_id):
+        self.id = role_id
+
+
+class FakeGuild:
+    id = 1
+
+
+class FakeMember:
+    id = 10
+    guild = FakeGuild()
+
+    def __init__(self):
+        self.calls = []
+
+    async def add_roles(self, *roles, reason=None):
+        self.calls.append(("add", [r.id for r in roles]))
+        await asyncio.sleep(0.01)
+        self.calls.append(("add_done", [r.id for r in roles]))
+
+    async def remove_roles(self, *roles, reason=None):
+        self.calls.append(("remove", [r.id for r in roles]))
+        await asyncio.sleep(0.01)
+        self.calls.append(("remove_done", [r.id for r in roles]))
+
+
+def test_metrics_is_a_method():
+    assert callable(RequestScheduler.metrics)
+    assert set(RequestScheduler().metrics()) == set(Priority)
+
+
+def test_pending_role_edits_coalesce():
+    async def run():
+        scheduler = RequestScheduler()
+        member = FakeMember()
+        first = scheduler.edit_roles(member, add=[FakeRole(1)])
+        second = scheduler.edit_roles(member, add=[FakeRole(2)], remove=[FakeRole(1)])
+        assert first is second
+        await first
+        await scheduler.stop()
+        return member.calls, scheduler.metrics()[Priority.MODERATION]
+
+    calls, metrics = asyncio.run(run())
+    assert calls == [("add", [2]), ("add_done", [2]), ("remove", [1]), ("remove_done", [1])]
+    assert metrics["coalesced"] == 1
+
+
+def test_role_edits_for_one_member_never_overlap():
+    async def run():
+        scheduler = RequestScheduler(workers=4)
+        member = FakeMember()
+        first = scheduler.edit_roles(member, add=[FakeRole(1)])
+        await asyncio.sleep(0.005)  # first job is running now
+        second = scheduler.edit_roles(member, remove=[FakeRole(1)])
+        assert second is not first
+        await asyncio.gather(first, second)
+        await scheduler.stop()
+        return member.calls
+
+    calls = asyncio.run(run())
+    assert calls == [("add", [1]), ("add_done", [1]), ("remove", [1]), ("remove_done", [1])]
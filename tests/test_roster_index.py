@@ -0,0 +1,32 @@
+import os
+
+from ..data_manager import DataManager
+from ..roster_index import RosterIndex
+
+
+def make_index(tmp_path):
+    dm = DataManager(str(tmp_path / "data.json"), str(tmp_path / "log.txt"))
+    dm.set_person("leaders", "John_Doe", {"організація": "LSPD"})
+    dm.set_person("leaders", "Anna_Johnson", {"організація": "EMS"})
+    dm.set_person("deputies", "Jack_Black", {"організація": "LSPD"})
+    return dm, RosterIndex(dm)
+
+
+def test_prefix_hits_come_before_substring_hits(tmp_path):
+    _dm, index = make_index(tmp_path)
+    assert index.nicknames("jo") == ["John_Doe", "Anna_Johnson"]
+    assert index.nicknames("J", category="deputies") == ["Jack_Black"]
+    assert index.nicknames("", limit=2) == ["Anna_Johnson", "Jack_Black"]
+    assert index.organizations("l") == ["LSPD"]
+    assert index.size() == 3
+
+
+def test_index_follows_data_file_changes(tmp_path):
+    dm, index = make_index(tmp_path)
+    assert index.nicknames("zed") == []
+    dm.set_person("deputies", "Zed_Smith", {"організація": "FIB"})
+    # Make sure the mtime differs even if both writes landed in one tick
+    stat = os.stat(dm.data_path)
+    os.utime(dm.data_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert index.nicknames("zed") == ["Zed_Smith"]
+    assert "FIB" in index.organizations("")
@@ -0,0 +1,59 @@
+import os
+from datetime import datetime, timedelta
+
+from ..snapshots import STAMP_FMT, SnapshotStore
+
+
+def make_snapshot(store, when, pre_restore=False):
+    path = store._path(when.strftime(STAMP_FMT), pre_restore)
+    open(path, "wb").close()
+    return path
+
+
+def test_unchanged_roster_is_not_written_again(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    assert store.take({"leaders": {}}) is not None
+    assert store.take({"leaders": {}}) is None
+    assert store.take({"leaders": {"A": {}}}) is not None
+    assert len(store.list()) == 2
+
+
+def test_pre_restore_is_always_written_and_kept_apart(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    regular = store.take({"leaders": {}})
+    undo = store.take({"leaders": {}}, pre_restore=True)
+    assert undo is not None and undo != regular
+    assert store.is_pre_restore(undo) and not store.is_pre_restore(regular)
+    # Stamps stay unique across both series
+    assert len({stamp for stamp, _path in store.list()}) == 2
+    assert store.load(undo) == {"leaders": {}}
+
+
+def test_concurrent_stores_never_share_a_file(tmp_path):
+    first, second = SnapshotStore(str(tmp_path)), SnapshotStore(str(tmp_path))
+    paths = {first.take({"n": 1}), second.take({"n": 2}), first.take({"n": 3}, pre_restore=True)}
+    assert len(paths) == 3
+    assert sorted(first.load(p)["n"] for p in paths) == [1, 2, 3]
+
+
+def test_prune_thins_old_regular_snapshots_but_keeps_pre_restore(tmp_path):
+    store = SnapshotStore(str(tmp_path), keep_hourly=2, keep_daily=1, keep_pre_restore=2, keep_recent=1)
+    now = datetime.now().replace(microsecond=0)
+    old = [make_snapshot(store, now - timedelta(days=3, minutes=i)) for i in range(3)]
+    undo = [make_snapshot(store, now - timedelta(days=5, minutes=i), pre_restore=True) for i in range(3)]
+    recent = make_snapshot(store, now - timedelta(minutes=1))
+    store.prune()
+    remaining = {path for _stamp, path in store.list()}
+    assert recent in remaining
+    assert not remaining & set(old[1:])
+    # The newest two undo copies survive regardless of age
+    assert remaining & set(undo) == {undo[0], undo[1]}
+
+
+def test_prune_ignores_files_removed_concurrently(tmp_path):
+    store = SnapshotStore(str(tmp_path), keep_hourly=0, keep_daily=0, keep_recent=0)
+    path = make_snapshot(store, datetime.now() - timedelta(days=2))
+    listed = store.list()
+    os.remove(path)
+    store.list = lambda: listed
+    assert store.prune() == 0
@@ -0,0 +1,22 @@
+import json
+
+from ..warm_state import WARM_STATE_VERSION, WarmState
+
+
+def test_state_is_consumed_once(tmp_path):
+    state = WarmState(str(tmp_path / "warm_state.json"))
+    state.save([[1, 2, 3.0, 2]], activity=[{"member_id": 5}], commands=7)
+    loaded = state.consume()
+    assert loaded["deletions"] == [[1, 2, 3.0, 2]]
+    assert loaded["activity"] == [{"member_id": 5}] and loaded["commands"] == 7
+    assert state.consume() == {}
+
+
+def test_unknown_version_or_broken_file_is_ignored(tmp_path):
+    path = tmp_path / "warm_state.json"
+    state = WarmState(str(path))
+    path.write_text(json.dumps({"version": WARM_STATE_VERSION + 1, "commands": 3}), encoding="utf-8")
+    assert state.consume() == {}
+    path.write_text("{broken", encoding="utf-8")
+    assert state.consume() == {}
+    assert not path.exists()
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import pytest
+
+from ..worker_pool import JobCancelled, WorkerPool
+
+
+def count_job(total, progress=None):
+    for i in range(total):
+        progress.report(i + 1, total)
+    return total
+
+
+def wait_for_cancel_job(progress=None):
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        progress.check()
+        time.sleep(0.01)
+    return "not cancelled"
+
+
+def test_job_result_and_progress():
+    async def run():
+        pool = WorkerPool(max_workers=1, poll_interval=0.05)
+        seen = []
+
+        async def on_progress(job):
+            seen.append((job.done, job.total))
+
+        try:
+            job = pool.submit("count", count_job, 3, on_progress=on_progress)
+            assert await job.future == 3
+            for _ in range(40):
+                if seen and seen[-1] == (3, 3):
+                    break
+                await asyncio.sleep(0.05)
+            return job.status, seen
+        finally:
+            pool.shutdown()
+
+    status, seen = asyncio.run(run())
+    assert status == "done"
+    assert seen[-1] == (3, 3)
+
+
+def test_cancel_running_job_leaves_no_flag():
+    async def run():
+        pool = WorkerPool(max_workers=1, poll_interval=0.05)
+        try:
+            job = pool.submit("wait", wait_for_cancel_job)
+            while job.status != "running":
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.1)
+            assert pool.cancel(job.id)
+            with pytest.raises(JobCancelled):
+                await job.future
+            return job.status, dict(pool._cancel_flags)
+        finally:
+            pool.shutdown()
+
+    status, flags = asyncio.run(run())
+    assert status == "cancelled"
+    assert flags == {}
+
+
+def test_cancel_queued_job():
+    async def run():
+        pool = WorkerPool(max_workers=1, max_concurrent_jobs=1, poll_interval=0.05)
+        try:
+            first = pool.submit("count", count_job, 1)
+            second = pool.submit("count", count_job, 1)
+            assert pool.cancel(second.id)
+            assert await first.future == 1
+            with pytest.raises(JobCancelled):
+                await second.future
+            return second.status
+        finally:
+            pool.shutdown()
+
+    assert asyncio.run(run()) == "cancelled"
@@ -0,0 +1,50 @@
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+WARM_STATE_VERSION = 1
+
+
+class WarmState:
+    # Runtime state that would otherwise die with the process: written once on
+    # graceful shutdown and consumed once on the next start.
+    def __init__(self, path: str):
+        self.path = path
+
+    def save(
+        self,
+        deletions: List[List[float]],
+        activity: Optional[List[Dict[str, Any]]] = None,
+        commands: int = 0,
+    ) -> None:
+        # deletions: [channel_id, message_id, due (epoch seconds), priority]
+        state = {
+            "version": WARM_STATE_VERSION,
+            "saved_at": time.time(),
+            "deletions": deletions,
+            "activity": activity or [],
+            "commands": commands,
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def consume(self) -> Dict[str, Any]:
+        # The file is removed after reading so a crash later on can never
+        # replay the same counters twice.
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            state = {}
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+        if not isinstance(state, dict) or state.get("version") != WARM_STATE_VERSION:
+            return {}
+        return state
@@ -0,0 +1,194 @@
+import asyncio
+import itertools
+import multiprocessing
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobProgress:
+    # Handed to job functions running in a worker process. Both the progress
+    # queue and the cancel flags are multiprocessing.Manager proxies, so this
+    # object pickles cleanly into the child.
+    def __init__(self, job_id: int, queue: Any, cancel_flags: Any):
+        self.job_id = job_id
+        self._queue = queue
+        self._cancel_flags = cancel_flags
+
+    def report(self, done: int, total: int, note: str = "") -> None:
+        try:
+            self._queue.put_nowait((self.job_id, done, total, note))
+        except Exception:
+            pass
+
+    def cancelled(self) -> bool:
+        return bool(self._cancel_flags.get(self.job_id))
+
+    def check(self) -> None:
+        if self.cancelled():
+            raise JobCancelled()
+
+
+@dataclass
+class Job:
+    id: int
+    name: str
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    done: int = 0
+    total: int = 0
+    note: str = ""
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    on_progress: Optional[Callable[["Job"], Awaitable[None]]] = None
+    future: Optional[asyncio.Future] = None
+
+
+class WorkerPool:
+    # The event loop only awaits results; CPU/IO-heavy work runs in separate
+    # processes so it can never stall the gateway heartbeat.
+    def __init__(self, max_workers: int = 2, max_concurrent_jobs: int = 2, poll_interval: float = 0.5):
+        self.max_workers = max_workers
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.poll_interval = poll_interval
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._queue = None
+        self._cancel_flags = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        # Manager proxies do blocking IPC. The progress reader blocks in its
+        # own thread; cancel-flag writes go through one thread in FIFO order,
+        # so a cancel can never land after the job's final pop.
+        self._progress_thread: Optional[ThreadPoolExecutor] = None
+        self._flags_thread: Optional[ThreadPoolExecutor] = None
+        self._pump: Optional[asyncio.Task] = None
+        self._ids = itertools.count(1)
+        self.jobs: Dict[int, Job] = {}
+
+    def _ensure_started(self) -> None:
+        if self._executor is None:
+            self._manager = multiprocessing.Manager()
+            self._queue = self._manager.Queue()
+            self._cancel_flags = self._manager.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            self._slots = asyncio.Semaphore(self.max_concurrent_jobs)
+            self._progress_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pool-progress")
+            self._flags_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pool-flags")
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.get_running_loop().create_task(self._pump_progress())
+
+    def _read_progress(self) -> list:
+        # Runs in the progress thread: wait up to poll_interval for the first
+        # report, then take what is queued.
+        reports = []
+        try:
+            reports.append(self._queue.get(timeout=self.poll_interval))
+            while True:
+                reports.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        except Exception:
+            # Manager already shut down; avoid a busy loop until the pump is cancelled
+            time.sleep(self.poll_interval)
+        return reports
+
+    async def _pump_progress(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            reports = await loop.run_in_executor(self._progress_thread, self._read_progress)
+            updated = {}
+            for job_id, done, total, note in reports:
+                job = self.jobs.get(job_id)
+                if job:
+                    job.done, job.total, job.note = done, total, note
+                    updated[job_id] = job
+            for job in updated.values():
+                if job.on_progress:
+                    try:
+                        await job.on_progress(job)
+                    except Exception:
+                        pass
+
+    def submit(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        *args: Any,
+        on_progress: Optional[Callable[[Job], Awaitable[None]]] = None,
+    ) -> Job:
+        # func must be a module-level function importable in the child; it
+        # receives a JobProgress as the "progress" keyword argument.
+        self._ensure_started()
+        job = Job(next(self._ids), name, on_progress=on_progress)
+        self.jobs[job.id] = job
+        job.future = asyncio.get_running_loop().create_task(self._run(job, func, args))
+        self._forget_finished()
+        return job
+
+    async def _run(self, job: Job, func: Callable[..., Any], args: tuple) -> Any:
+        async with self._slots:
+            if job.status == "cancelled":
+                raise JobCancelled()
+            job.status = "running"
+            job.started_at = time.monotonic()
+            progress = JobProgress(job.id, self._queue, self._cancel_flags)
+            loop = asyncio.get_running_loop()
+            # The status turns final before the flag is popped, so cancel()
+            # cannot queue a write behind the pop
+            try:
+                result = await loop.run_in_executor(self._executor, _call_job, func, args, progress)
+                job.status = "done"
+            except JobCancelled:
+                job.status = "cancelled"
+                raise
+            except Exception:
+                job.status = "failed"
+                raise
+            finally:
+                await loop.run_in_executor(self._flags_thread, self._cancel_flags.pop, job.id, None)
+            return result
+
+    def cancel(self, job_id: int) -> bool:
+        job = self.jobs.get(job_id)
+        if not job or job.status not in ("queued", "running"):
+            return False
+        if job.status == "queued":
+            job.status = "cancelled"
+        else:
+            # Cooperative: the job notices on its next progress.check()
+            self._flags_thread.submit(self._cancel_flags.__setitem__, job_id, True)
+        return True
+
+    def _forget_finished(self, keep: int = 20) -> None:
+        finished = [j for j in self.jobs.values() if j.status in ("done", "failed", "cancelled")]
+        for job in finished[:-keep]:
+            self.jobs.pop(job.id, None)
+
+    def active_jobs(self) -> List[Job]:
+        return [j for j in self.jobs.values() if j.status in ("queued", "running")]
+
+    def shutdown(self) -> None:
+        for job in self.active_jobs():
+            self.cancel(job.id)
+        if self._pump:
+            self._pump.cancel()
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        for thread in (self._progress_thread, self._flags_thread):
+            if thread:
+                thread.shutdown(wait=False)
+        self._progress_thread = self._flags_thread = None
+        if self._manager:
+            self._manager.shutdown()
+            self._manager = None
+
+
+def _call_job(func: Callable[..., Any], args: tuple, progress: JobProgress) -> Any:
+    progress.check()
+    return func(*args, progress=progress)